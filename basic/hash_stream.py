@@ -16,4 +16,5 @@ def hash_stream(stream: IO, chunk_size: int = 4096) -> str:
     return shash.hexdigest()
 
 
-print(hash_stream(open(__file__)))  # df5f3c2a829b62954410a3a09a1b7d37
+if __name__ == "__main__":
+    print(hash_stream(open(__file__)))  # df5f3c2a829b62954410a3a09a1b7d37
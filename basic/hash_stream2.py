@@ -27,5 +27,6 @@ def hash_stream_md5(stream: IO, chunk_size: int = 4096) -> str:
     return shash.hexdigest()
 
 
-print(hash_stream_sha1(open(__file__)))
-print(hash_stream_md5(open(__file__)))
+if __name__ == "__main__":
+    print(hash_stream_sha1(open(__file__)))
+    print(hash_stream_md5(open(__file__)))
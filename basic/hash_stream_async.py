@@ -0,0 +1,87 @@
+"""
+StreamHasher는 블로킹 IO만 받기 때문에 asyncio 기반 서비스에서는 업로드를 디스크에 쓴 뒤 다시 해싱해야 함.
+asyncio.StreamReader나 임의의 비동기 바이트 이터레이터에서 데이터가 도착하는 대로 해싱하고,
+큰 청크의 update는 hashlib이 GIL을 해제하므로 스레드로 넘겨 이벤트 루프가 막히지 않게 함.
+"""
+
+import asyncio
+from hashlib import md5
+from typing import AsyncIterable, Callable
+
+
+class AsyncStreamHasher(object):
+    """Stream hasher for asyncio readers and async byte iterators"""
+
+    def __init__(
+        self,
+        algorithm: Callable = md5,
+        chunk_size: int = 64 * 1024,
+        offload_size: int = 256 * 1024,
+    ) -> None:
+        self.algorithm = algorithm
+        self.chunk_size = chunk_size
+        # offload_size 이상인 청크만 스레드에서 해싱함. 작은 청크는 스레드로 넘기는 비용이 더 큼.
+        self.offload_size = offload_size
+        # 스레드로 넘긴 update 횟수
+        self.offloaded = 0
+
+    async def __call__(self, source: asyncio.StreamReader | AsyncIterable[bytes]) -> str:
+        shash = self.algorithm()
+
+        if isinstance(source, asyncio.StreamReader):
+            source = self._iter_reader(source)
+
+        async for chunk in source:
+            if len(chunk) >= self.offload_size:
+                await asyncio.to_thread(shash.update, chunk)
+                self.offloaded += 1
+            else:
+                shash.update(chunk)
+
+        return shash.hexdigest()
+
+    async def _iter_reader(self, reader: asyncio.StreamReader) -> AsyncIterable[bytes]:
+        """
+        StreamReader.read는 버퍼에 쌓인 만큼(기본 limit 64 KiB)만 돌려주므로 그대로 넘기면 offload_size에 닿지 않음.
+        offload_size까지 모아서 넘겨야 큰 update가 스레드로 넘어감.
+        """
+
+        pending = bytearray()
+        while chunk := await reader.read(self.chunk_size):
+            pending += chunk
+            if len(pending) >= self.offload_size:
+                # 스레드에서 해싱하는 동안 바뀌지 않도록 새 버퍼로 바꿈
+                yield pending
+                pending = bytearray()
+
+        if pending:
+            yield pending
+
+
+if __name__ == "__main__":
+
+    async def upload() -> AsyncIterable[bytes]:
+        for _ in range(8):
+            await asyncio.sleep(0)
+            yield b"x" * (1024 * 1024)
+
+    async def main() -> None:
+        hasher = AsyncStreamHasher()
+        print(await hasher(upload()) == md5(b"x" * 8 * 1024 * 1024).hexdigest())
+        # True
+
+        # StreamReader에서 읽은 데이터도 offload_size까지 모여 스레드로 넘어가는지 확인
+        hasher = AsyncStreamHasher()
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"x" * 8 * 1024 * 1024)
+        reader.feed_eof()
+        print(await hasher(reader) == md5(b"x" * 8 * 1024 * 1024).hexdigest(), hasher.offloaded > 0)
+        # True True
+
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"$GPGLL,3751.65,S,14507.36,E*77")
+        reader.feed_eof()
+        print(await hasher(reader))
+        # 6a5b3c10fd38d2ca14462ea2bddd181d
+
+    asyncio.run(main())
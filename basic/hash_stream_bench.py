@@ -0,0 +1,133 @@
+"""
+basic에 있는 hash_stream 구현들(함수, 알고리즘별 함수, get_hash 클래스, 호출 가능한 클래스)을
+같은 입력 크기와 알고리즘에서 실행해 추상화의 비용을 비교함.
+할당은 스트림을 감싸 read가 돌려준 청크 객체 수와 그 크기를 세어 입력 1MB당 값으로 나타냄.
+readinto는 호출하는 쪽의 버퍼를 채우므로 세지 않음. 텍스트 경로는 청크마다 encode로 bytes를 한 번 더 만들지만
+스트림 바깥의 할당이라 여기에는 포함되지 않음. 최대 메모리는 tracemalloc의 peak를 KiB로 따로 나타냄.
+
+    python -m basic.hash_stream_bench
+"""
+
+import io
+import sys
+import tracemalloc
+from hashlib import md5, sha1
+from time import perf_counter
+from typing import IO, Callable
+
+from basic import hash_stream, hash_stream2, hash_stream_refactored, hash_stream_refactored2
+
+SIZES = [64 * 1024, 1024 * 1024, 16 * 1024 * 1024]
+CHUNK_SIZE = 4096
+REPEAT = 3
+
+
+def variants(algorithm: Callable) -> dict[str, tuple[Callable[[IO], str], bool]]:
+    """이름 -> (스트림을 받아 다이제스트를 반환하는 함수, 바이너리 스트림 여부)"""
+
+    found: dict[str, tuple[Callable[[IO], str], bool]] = {}
+
+    if algorithm is md5:
+        found["hash_stream"] = (lambda s: hash_stream.hash_stream(s, CHUNK_SIZE), False)
+        found["hash_stream_md5"] = (lambda s: hash_stream2.hash_stream_md5(s, CHUNK_SIZE), False)
+    if algorithm is sha1:
+        found["hash_stream_sha1"] = (lambda s: hash_stream2.hash_stream_sha1(s, CHUNK_SIZE), False)
+
+    # 이전 클래스는 호출 사이에 해시 상태를 유지하므로 매번 새로 만듦
+    found["StreamHasher.get_hash"] = (
+        lambda s: hash_stream_refactored.StreamHasher(algorithm, CHUNK_SIZE).get_hash(s),
+        False,
+    )
+    callable_hasher = hash_stream_refactored2.StreamHasher(algorithm, CHUNK_SIZE)
+    found["StreamHasher() text"] = (callable_hasher, False)
+    found["StreamHasher() binary"] = (callable_hasher, True)
+
+    return found
+
+
+class CountingText(io.TextIOBase):
+    """read가 돌려준 str 객체의 수와 크기를 셈"""
+
+    def __init__(self, stream: IO[str]) -> None:
+        self.stream = stream
+        self.objects = 0
+        self.bytes = 0
+
+    def read(self, size: int | None = -1) -> str:
+        chunk = self.stream.read(size)
+        self.objects += 1
+        self.bytes += sys.getsizeof(chunk)
+        return chunk
+
+
+class CountingBinary(io.RawIOBase):
+    """read가 돌려준 bytes 객체의 수와 크기를 셈. readinto는 새 객체를 만들지 않으므로 그대로 넘김"""
+
+    def __init__(self, stream: IO[bytes]) -> None:
+        self.stream = stream
+        self.objects = 0
+        self.bytes = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore[override]
+        return self.stream.readinto(buffer)  # type: ignore[attr-defined]
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.stream.read(size)
+        self.objects += 1
+        self.bytes += sys.getsizeof(chunk)
+        return chunk
+
+
+def run(
+    func: Callable[[IO], str], stream: CountingText | CountingBinary, size: int
+) -> tuple[str, float, float, float, float]:
+    """(다이제스트, MB/s, 1MB당 청크 객체 수, 1MB당 청크 바이트, 최대 메모리 KiB)"""
+
+    start = perf_counter()
+    digest = func(stream)
+    elapsed = perf_counter() - start
+
+    # tracemalloc은 할당마다 비용이 들기 때문에 시간과 따로 측정함
+    stream.stream.seek(0)
+    tracemalloc.start()
+    func(stream)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # 두 번 실행했으므로 센 값을 반으로 나눔
+    size_mb = size / (1024 * 1024)
+    objects = stream.objects / 2 / size_mb
+    chunk_bytes = stream.bytes / 2 / size_mb
+    return digest, size_mb / elapsed, objects, chunk_bytes, peak / 1024
+
+
+if __name__ == "__main__":
+    print(
+        f"{'variant':24} {'algorithm':9} {'size':>10} {'MB/s':>9} "
+        f"{'objs/MB':>8} {'chunk B/MB':>11} {'peak KiB':>9}"
+    )
+
+    for algorithm in (md5, sha1):
+        for size in SIZES:
+            text = ("0123456789abcdef" * (size // 16))[:size]
+            data = text.encode("utf-8")
+            expected = algorithm(data).hexdigest()
+
+            for name, (func, binary) in variants(algorithm).items():
+                rate = 0.0
+                for _ in range(REPEAT):
+                    stream = (
+                        CountingBinary(io.BytesIO(data))
+                        if binary
+                        else CountingText(io.StringIO(text))
+                    )
+                    digest, run_rate, objects, chunk_bytes, peak = run(func, stream, size)
+                    assert digest == expected, name
+                    rate = max(rate, run_rate)
+                print(
+                    f"{name:24} {algorithm().name:9} {size:>10} {rate:>9.1f} "
+                    f"{objects:>8.0f} {chunk_bytes:>11.0f} {peak:>9.1f}"
+                )
@@ -0,0 +1,239 @@
+"""
+바뀌지 않은 파일을 다시 해싱하는 것이 가장 큰 낭비임.
+StreamHasher 앞에 프록시처럼 동작하는 캐시를 두고, 파일의 식별 정보(경로, 장치, inode, 크기, mtime_ns)와 알고리즘이
+이전과 같으면 파일을 읽지 않고 저장된 다이제스트를 반환함. 저장소는 표준 라이브러리의 SQLite를 사용함.
+"""
+
+import os
+import sqlite3
+from hashlib import md5
+from pathlib import Path
+from typing import Callable, Iterable
+
+from basic.hash_stream_refactored2 import StreamHasher
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    path TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    device INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (path, algorithm)
+);
+CREATE INDEX IF NOT EXISTS digests_used ON digests (used);
+"""
+
+
+def cache_key(path: str | Path) -> str:
+    """
+    캐시 키로 쓰는 절대 경로. Path.resolve()는 경로 구성 요소마다 lstat을 호출해 적중 비용의 대부분을 차지하므로
+    심볼릭 링크는 풀지 않음. 같은 파일을 다른 경로로 부르면 항목이 따로 생기지만 식별 정보로 검증하므로 결과는 같음.
+    """
+
+    return os.path.abspath(path)
+
+
+def file_identity(path: str | Path) -> tuple[int, int, int, int]:
+    info = os.stat(path)
+    return info.st_dev, info.st_ino, info.st_size, info.st_mtime_ns
+
+
+class CachedStreamHasher(object):
+    """StreamHasher proxy returning cached digests for unchanged files"""
+
+    def __init__(
+        self,
+        db_path: str | Path = ":memory:",
+        algorithm: Callable = md5,
+        chunk_size: int = 1024 * 1024,
+        max_entries: int = 1_000_000,
+        flush_every: int = 1000,
+    ) -> None:
+        self.algorithm = algorithm
+        self.algorithm_name = algorithm().name
+        self.chunk_size = chunk_size
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # 조회마다 커밋하면 디스크 DB에서는 적중이 다시 해싱하는 것보다 느려짐.
+        # LRU 갱신은 메모리에 모았다가, 저장은 트랜잭션에 쌓아 두었다가 flush_every번마다 한 번에 커밋함.
+        # 커밋하기 전에 프로세스가 죽으면 마지막 묶음의 캐시만 잃고 다음 실행에서 다시 해싱됨.
+        self.flush_every = flush_every
+        self.pending_touch: dict[str, int] = {}
+        self.pending_writes = 0
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.entries, self.clock = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(used), 0) FROM digests"
+        ).fetchone()
+
+    def __call__(self, path: str | Path) -> str:
+        key = cache_key(path)
+        identity = file_identity(key)
+
+        row = self.conn.execute(
+            "SELECT device, inode, size, mtime_ns, digest FROM digests "
+            "WHERE path = ? AND algorithm = ?",
+            (key, self.algorithm_name),
+        ).fetchone()
+
+        if row is not None and tuple(row[:4]) == identity:
+            self.hits += 1
+            self._touch([key])
+            return row[4]
+
+        self.misses += 1
+        with open(key, "rb") as stream:
+            digest = StreamHasher(algorithm=self.algorithm, chunk_size=self.chunk_size)(stream)
+
+        self._store(key, identity, digest, is_new=row is None)
+        return digest
+
+    def lookup_many(self, paths: Iterable[str | Path]) -> dict[Path, str]:
+        """디렉터리 스캔용 일괄 조회. 캐시가 유효한 경로만 결과에 포함되며 파일은 읽지 않음"""
+
+        wanted = {}
+        for path in paths:
+            key = cache_key(path)
+            try:
+                wanted[key] = (Path(key), file_identity(key))
+            except OSError:
+                continue
+
+        found: dict[Path, str] = {}
+        keys = list(wanted)
+        # SQLite의 바인딩 변수 개수 제한을 넘지 않도록 나눠서 조회함
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]  # noqa
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                "SELECT path, device, inode, size, mtime_ns, digest FROM digests "
+                f"WHERE algorithm = ? AND path IN ({placeholders})",
+                (self.algorithm_name, *batch),
+            )
+            for key, *identity, digest in rows:
+                path, current = wanted[key]
+                if tuple(identity) == current:
+                    found[path] = digest
+
+        self.hits += len(found)
+        self.misses += len(wanted) - len(found)
+        self._touch([str(path) for path in found])
+        return found
+
+    def _touch(self, keys: list[str]) -> None:
+        """LRU 순서를 갱신하기 위해 사용 시각 대신 단조 증가하는 카운터를 기록함. DB에는 flush()에서 씀"""
+
+        for key in keys:
+            self.clock += 1
+            self.pending_touch[key] = self.clock
+
+        if len(self.pending_touch) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """모아 둔 LRU 갱신을 쓰고 커밋함"""
+
+        if self.pending_touch:
+            self.conn.executemany(
+                "UPDATE digests SET used = ? WHERE path = ? AND algorithm = ?",
+                [(used, key, self.algorithm_name) for key, used in self.pending_touch.items()],
+            )
+            self.pending_touch.clear()
+
+        self.conn.commit()
+        self.pending_writes = 0
+
+    def _store(
+        self, key: str, identity: tuple[int, int, int, int], digest: str, is_new: bool
+    ) -> None:
+        self.clock += 1
+        self.conn.execute(
+            "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, self.algorithm_name, *identity, digest, self.clock),
+        )
+        self.entries += is_new
+
+        if self.entries > self.max_entries:
+            # 오래된 항목을 고르기 전에 모아 둔 사용 기록을 반영함
+            self.flush()
+            overflow = self.entries - self.max_entries
+            self.conn.execute(
+                "DELETE FROM digests WHERE rowid IN "
+                "(SELECT rowid FROM digests ORDER BY used LIMIT ?)",
+                (overflow,),
+            )
+            self.entries -= overflow
+
+        self.pending_writes += 1
+        if self.pending_writes >= self.flush_every:
+            self.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    hasher = CachedStreamHasher()
+    paths = sorted(Path(__file__).parent.glob("*.py"))
+
+    for _ in range(2):
+        for path in paths:
+            hasher(path)
+
+    # 두 번째 순회는 파일을 읽지 않고 캐시에서 다이제스트를 가져옴
+    print(hasher.hits == len(paths), hasher.misses == len(paths))
+    # True True
+
+    print(len(hasher.lookup_many(paths)) == len(paths))
+    # True
+    hasher.close()
+
+    # 디스크 DB에서 캐시 적중이 다시 해싱하는 것보다 싼지 측정함.
+    # 적중 비용(stat 한 번과 SELECT 한 번)은 파일 크기와 무관하고, 재해싱은 페이지 캐시에 올라온 파일이라도 크기에 비례함.
+    import tempfile
+    from time import perf_counter
+
+    for size in (4 * 1024, 64 * 1024, 1024 * 1024):
+        with tempfile.TemporaryDirectory() as tmp:
+            count = 200 if size >= 1024 * 1024 else 2000
+            files = []
+            for idx in range(count):
+                path = Path(tmp, f"{idx}.bin")
+                path.write_bytes(os.urandom(size))
+                files.append(path)
+
+            start = perf_counter()
+            for path in files:
+                md5(path.read_bytes()).hexdigest()
+            rehash = perf_counter() - start
+
+            hasher = CachedStreamHasher(Path(tmp, "cache.db"))
+            for path in files:
+                hasher(path)
+
+            start = perf_counter()
+            for path in files:
+                hasher(path)
+            cached = perf_counter() - start
+
+            start = perf_counter()
+            hasher.lookup_many(files)
+            batched = perf_counter() - start
+            hasher.close()
+
+            print(
+                f"{count} x {size // 1024:>4} KiB: rehash {rehash:.3f}s, "
+                f"hits {cached:.3f}s, lookup_many {batched:.3f}s"
+            )
+    # 2000 x    4 KiB: rehash 0.045s, hits 0.035s, lookup_many 0.050s
+    # 2000 x   64 KiB: rehash 0.308s, hits 0.041s, lookup_many 0.037s
+    # 200 x 1024 KiB: rehash 0.474s, hits 0.002s, lookup_many 0.003s
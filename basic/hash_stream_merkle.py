@@ -0,0 +1,155 @@
+"""
+50GB 파일을 md5 하나로 선형 해싱하면 코어 하나만 사용하고, 일부만 바뀌어도 전체를 다시 해싱해야 함.
+파일을 고정 크기의 리프로 나눠 병렬로 해싱하고 리프 다이제스트를 이진 트리로 결합해 루트 다이제스트를 만들면,
+리프 다이제스트를 저장해 두었다가 뒤에 덧붙여졌거나 일부 구간만 바뀐 파일은 더러워진 리프만 다시 해싱하면 됨.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Iterable
+
+# 리프와 내부 노드의 다이제스트가 서로 충돌하지 않도록 접두 바이트로 구분함
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+@dataclass
+class MerkleTree:
+    algorithm: str
+    leaf_size: int
+    size: int = 0
+    leaves: list[bytes] = field(default_factory=list)
+
+    @property
+    def root(self) -> bytes:
+        level = self.leaves or [hashlib.new(self.algorithm, LEAF_PREFIX).digest()]
+        while len(level) > 1:
+            pairs = (b"".join(level[idx : idx + 2]) for idx in range(0, len(level), 2))  # noqa
+            level = [hashlib.new(self.algorithm, NODE_PREFIX + pair).digest() for pair in pairs]
+
+        return level[0]
+
+    def hexdigest(self) -> str:
+        return self.root.hex()
+
+    def dump(self, fp: IO[str]) -> None:
+        json.dump(
+            {
+                "algorithm": self.algorithm,
+                "leaf_size": self.leaf_size,
+                "size": self.size,
+                "leaves": [leaf.hex() for leaf in self.leaves],
+            },
+            fp,
+        )
+
+    @classmethod
+    def load(cls, fp: IO[str]) -> "MerkleTree":
+        data = json.load(fp)
+        data["leaves"] = [bytes.fromhex(leaf) for leaf in data["leaves"]]
+        return cls(**data)
+
+
+class MerkleHasher(object):
+    """Tree hasher with parallel leaves and incremental rehash"""
+
+    def __init__(
+        self,
+        algorithm: str = "sha256",
+        leaf_size: int = 4 * 1024 * 1024,
+        max_workers: int | None = None,
+    ) -> None:
+        self.algorithm = algorithm
+        self.leaf_size = leaf_size
+        self.max_workers = max_workers
+
+    def __call__(self, path: str | Path) -> MerkleTree:
+        tree = MerkleTree(self.algorithm, self.leaf_size, os.path.getsize(path))
+        tree.leaves = self._hash_leaves(path, range(self._leaf_count(tree.size)))
+        return tree
+
+    def rehash(
+        self,
+        path: str | Path,
+        previous: MerkleTree,
+        dirty: Iterable[tuple[int, int]] = (),
+    ) -> MerkleTree:
+        """
+        이전 트리를 바탕으로 바뀐 리프만 다시 해싱함.
+        dirty는 바뀐 바이트 구간 (start, end)의 목록이며, 파일 끝에 덧붙여진 구간은 크기 비교로 자동으로 찾음.
+        """
+
+        if (previous.algorithm, previous.leaf_size) != (self.algorithm, self.leaf_size):
+            return self(path)
+
+        size = os.path.getsize(path)
+        if size < previous.size:
+            # 파일이 줄어들었으면 어떤 구간이 사라졌는지 알 수 없으므로 전체를 다시 해싱함
+            return self(path)
+
+        count = self._leaf_count(size)
+        stale = set()
+        if size > previous.size and previous.leaves:
+            # 마지막 리프는 덧붙여진 바이트로 채워졌을 수 있음
+            stale.add(len(previous.leaves) - 1)
+        stale.update(range(len(previous.leaves), count))
+        for start, end in dirty:
+            stale.update(range(start // self.leaf_size, min(count, -(-end // self.leaf_size))))
+
+        leaves = previous.leaves[:count] + [b""] * (count - len(previous.leaves))
+        dirty_indexes = sorted(stale)
+        for idx, digest in zip(dirty_indexes, self._hash_leaves(path, dirty_indexes)):
+            leaves[idx] = digest
+
+        return MerkleTree(self.algorithm, self.leaf_size, size, leaves)
+
+    def _leaf_count(self, size: int) -> int:
+        return -(-size // self.leaf_size)
+
+    def _hash_leaves(self, path: str | Path, indexes: Iterable[int]) -> list[bytes]:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            # os.pread는 파일 위치를 공유하지 않으므로 여러 스레드가 하나의 파일 디스크립터를 함께 쓸 수 있고,
+            # 큰 리프에 대한 hashlib update는 GIL을 해제하므로 스레드 풀로도 여러 코어를 사용함
+            def hash_leaf(idx: int) -> bytes:
+                leaf = hashlib.new(self.algorithm, LEAF_PREFIX)
+                leaf.update(os.pread(fd, self.leaf_size, idx * self.leaf_size))
+                return leaf.digest()
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                return list(executor.map(hash_leaf, indexes))
+        finally:
+            os.close(fd)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    hasher = MerkleHasher(leaf_size=1024)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp, "log.bin")
+        path.write_bytes(os.urandom(10_000))
+        tree = hasher(path)
+        print(len(tree.leaves), tree.hexdigest())
+        # 10 ...
+
+        with open(path, "ab") as f:
+            f.write(os.urandom(3_000))
+        with open(path, "r+b") as f:
+            f.seek(2_500)
+            f.write(b"changed")
+
+        incremental = hasher.rehash(path, tree, dirty=[(2_500, 2_507)])
+        print(incremental.hexdigest() == hasher(path).hexdigest())
+        # True
+
+        with open(Path(tmp, "log.bin.merkle"), "w") as f:
+            incremental.dump(f)
+        with open(Path(tmp, "log.bin.merkle")) as f:
+            print(MerkleTree.load(f) == incremental)
+            # True
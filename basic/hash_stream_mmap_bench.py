@@ -0,0 +1,46 @@
+"""
+StreamHasher의 청크 읽기(readinto) 경로와 mmap 경로를 파일 크기별로 비교해 mmap이 유리해지는 지점을 찾음.
+mmap은 매핑 자체의 고정 비용이 있기 때문에 작은 파일에서는 오히려 느리고, 파일이 커질수록 호출 비용 절감이 드러남.
+"""
+
+import os
+import tempfile
+from hashlib import md5
+from time import perf_counter
+
+from basic.hash_stream_refactored2 import StreamHasher
+
+SIZES = [2**exp for exp in range(12, 29, 2)]  # 4 KiB ~ 256 MiB
+
+
+def measure(path: str, mmap_threshold: int | None, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        with open(path, "rb") as stream:
+            start = perf_counter()
+            StreamHasher(algorithm=md5, chunk_size=64 * 1024, mmap_threshold=mmap_threshold)(stream)
+            best = min(best, perf_counter() - start)
+
+    return best
+
+
+if __name__ == "__main__":
+    print(f"{'size':>10} {'chunked MB/s':>14} {'mmap MB/s':>12}")
+
+    crossover = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            path = os.path.join(tmp, f"{size}.bin")
+            with open(path, "wb") as f:
+                f.write(os.urandom(size))
+
+            repeat = max(3, min(50, 2**26 // size))
+            chunked = measure(path, None, repeat)
+            mapped = measure(path, 0, repeat)
+            size_mb = size / (1024 * 1024)
+            print(f"{size:>10} {size_mb / chunked:>14.1f} {size_mb / mapped:>12.1f}")
+
+            if crossover is None and mapped < chunked:
+                crossover = size
+
+    print(f"mmap wins from {crossover} bytes")
@@ -0,0 +1,51 @@
+"""
+hash_stream_refactored처럼 알고리즘마다 StreamHasher를 하나씩 만들면 알고리즘의 수만큼 스트림을 다시 읽어야 함.
+각 청크를 한 번만 읽고 같은 memoryview를 여러 해시 객체에 넘기면 한 번의 I/O로 여러 다이제스트를 얻을 수 있음.
+"""
+
+import io
+from hashlib import blake2b, md5, sha1, sha256
+from typing import IO, Callable, Iterable
+
+
+class MultiStreamHasher(object):
+    """Stream hasher computing several digests in a single pass"""
+
+    def __init__(
+        self,
+        algorithms: Iterable[Callable] = (md5, sha1, sha256, blake2b),
+        chunk_size: int = 4096,
+    ) -> None:
+        self.algorithms = tuple(algorithms)
+        self.chunk_size = chunk_size
+        self.buffer = bytearray(chunk_size)
+
+    def __call__(self, stream: IO) -> dict[str, str]:
+        hashes = [algorithm() for algorithm in self.algorithms]
+
+        if isinstance(stream, io.TextIOBase) or not hasattr(stream, "readinto"):
+            for chunk in iter(lambda: stream.read(self.chunk_size), ""):
+                data = chunk.encode("utf-8")
+                for shash in hashes:
+                    shash.update(data)
+        else:
+            # 청크는 공유 버퍼에 한 번만 읽히고, 알고리즘마다 복사하지 않고 같은 슬라이스를 넘김
+            view = memoryview(self.buffer)
+            while size := stream.readinto(self.buffer):
+                chunk = view[:size]
+                for shash in hashes:
+                    shash.update(chunk)
+
+        return {shash.name: shash.hexdigest() for shash in hashes}
+
+
+if __name__ == "__main__":
+    hasher = MultiStreamHasher()
+
+    with open(__file__, "rb") as f:
+        for name, digest in hasher(f).items():
+            print(f"{name:8} {digest}")
+    # md5      ...
+    # sha1     ...
+    # sha256   ...
+    # blake2b  ...
@@ -0,0 +1,186 @@
+"""
+StreamHasher로 파일을 하나씩 해싱하면 hashlib이 큰 update에서 GIL을 해제하더라도 나머지 코어는 놀게 됨.
+StreamHasher를 그대로 재사용하면서 파일 단위의 작업을 스레드 풀(작은 파일은 선택적으로 프로세스 풀)에 나눠 맡기고,
+끝나는 순서대로 결과를 돌려받음. 결과의 순서는 보장되지 않으므로 매니페스트는 경로를 키로 하는 딕셔너리로 만듦.
+"""
+
+import os
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from hashlib import md5
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Iterable, Iterator
+
+from basic.hash_stream_refactored2 import StreamHasher
+
+
+def hash_file(path: Path, algorithm: Callable, chunk_size: int) -> tuple[Path, int, str]:
+    """워커에서 실행되는 단위 작업. 프로세스 풀로 보낼 수 있도록 모듈 수준 함수로 둠"""
+
+    with open(path, "rb") as stream:
+        digest = StreamHasher(algorithm=algorithm, chunk_size=chunk_size)(stream)
+        # 해싱 도중 경로가 지워지거나 바뀌어도 연 파일의 크기를 셈
+        size = os.fstat(stream.fileno()).st_size
+
+    return path, size, digest
+
+
+def _walk_files(root: str | os.PathLike) -> Iterator[Path]:
+    """
+    os.walk는 이름만 돌려주므로 깨진 심볼릭 링크, FIFO, 소켓, 장치 파일까지 파일로 취급하게 됨.
+    scandir의 DirEntry로 일반 파일(또는 일반 파일을 가리키는 링크)만 고르고 디렉터리 링크는 따라가지 않음.
+    읽을 수 없는 디렉터리는 건너뜀.
+    """
+
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from _walk_files(entry.path)
+                    elif entry.is_file():
+                        yield Path(entry.path)
+                except OSError:
+                    continue
+    except OSError:
+        return
+
+
+def iter_files(paths: Path | str | Iterable[Path | str]) -> Iterator[Path]:
+    """디렉터리 루트 하나 또는 경로들의 목록을 일반 파일 경로로 펼침"""
+
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from _walk_files(path)
+        elif path.is_file():
+            yield path
+
+
+@dataclass
+class HashStats:
+    files: int = 0
+    bytes: int = 0
+    started: float = field(default_factory=perf_counter)
+    elapsed: float = 0.0
+    # 해싱하지 못한 파일(스캔 도중 사라졌거나 권한이 없는 등)과 그 에러
+    errors: list[tuple[Path, OSError]] = field(default_factory=list)
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mb_per_sec(self) -> float:
+        return self.bytes / (1024 * 1024) / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        summary = (
+            f"{self.files} files, {self.files_per_sec:.1f} files/s, {self.mb_per_sec:.1f} MB/s"
+        )
+        return f"{summary}, {len(self.errors)} errors" if self.errors else summary
+
+
+class ParallelHasher(object):
+    """Hash many files concurrently on a bounded worker pool"""
+
+    def __init__(
+        self,
+        algorithm: Callable = md5,
+        chunk_size: int = 1024 * 1024,
+        max_workers: int | None = None,
+        small_file_size: int | None = None,
+    ) -> None:
+        self.algorithm = algorithm
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        # small_file_size를 지정하면 그보다 작은 파일은 프로세스 풀에서 해싱함.
+        # 작은 파일은 update 한 번이 너무 짧아 GIL 해제 효과를 거의 보지 못하기 때문.
+        self.small_file_size = small_file_size
+        self.stats = HashStats()
+
+    def __call__(self, paths: Path | str | Iterable[Path | str]) -> Iterator[tuple[Path, str]]:
+        """
+        끝나는 순서대로 (경로, 다이제스트)를 돌려줌.
+        해싱하지 못한 파일은 건너뛰고 self.stats.errors에 기록하므로 파일 하나 때문에 전체가 중단되지 않음.
+        """
+
+        self.stats = HashStats()
+        threads = ThreadPoolExecutor(max_workers=self.max_workers)
+        processes = ProcessPoolExecutor() if self.small_file_size is not None else None
+        pending: dict[Future, Path] = {}
+
+        try:
+            for path in iter_files(paths):
+                # 수십만 개의 Future를 한 번에 만들지 않도록 진행 중인 작업 수를 제한함
+                if len(pending) >= self.max_workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from self._collect(done, pending)
+
+                executor = self._executor_for(path, threads, processes)
+                future = executor.submit(hash_file, path, self.algorithm, self.chunk_size)
+                pending[future] = path
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from self._collect(done, pending)
+        finally:
+            for future in pending:
+                future.cancel()
+            threads.shutdown()
+            if processes is not None:
+                processes.shutdown()
+
+    def _executor_for(self, path: Path, threads: Executor, processes: Executor | None) -> Executor:
+        if processes is None:
+            return threads
+
+        try:
+            size = path.stat().st_size
+        except OSError:
+            # 사라진 파일은 스레드 풀의 hash_file에서 에러로 기록됨
+            return threads
+
+        return processes if size < self.small_file_size else threads
+
+    def _collect(
+        self, done: Iterable[Future], pending: dict[Future, Path]
+    ) -> Iterator[tuple[Path, str]]:
+        for future in done:
+            path = pending.pop(future)
+            try:
+                path, size, digest = future.result()
+            except OSError as error:
+                self.stats.errors.append((path, error))
+                continue
+
+            self.stats.files += 1
+            self.stats.bytes += size
+            self.stats.elapsed = perf_counter() - self.stats.started
+            yield path, digest
+
+    def manifest(self, root: Path | str) -> dict[str, str]:
+        """루트 기준 상대 경로를 키로 하는, 순서와 무관한 매니페스트"""
+
+        root = Path(root)
+        return {path.relative_to(root).as_posix(): digest for path, digest in self(root)}
+
+
+if __name__ == "__main__":
+    hasher = ParallelHasher()
+
+    for path, digest in hasher(Path(__file__).parent):
+        print(f"{digest}  {path}")
+
+    print(hasher.stats)
+    # 7 files, 2315.4 files/s, 0.1 MB/s
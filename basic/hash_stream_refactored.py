@@ -16,8 +16,9 @@ class StreamHasher(object):
         return self.hash.hexdigest()
 
 
-md5h = StreamHasher(algorithm=md5)
-sha1h = StreamHasher(algorithm=sha1)
+if __name__ == "__main__":
+    md5h = StreamHasher(algorithm=md5)
+    sha1h = StreamHasher(algorithm=sha1)
 
-print(md5h.get_hash(open(__file__)))  # 28a6551656f122998f038a9fdab1d4ee
-print(sha1h.get_hash(open(__file__)))  # aa52349f858613c7984d787a0936940b80ff8f9a
+    print(md5h.get_hash(open(__file__)))  # 28a6551656f122998f038a9fdab1d4ee
+    print(sha1h.get_hash(open(__file__)))  # aa52349f858613c7984d787a0936940b80ff8f9a
@@ -0,0 +1,75 @@
+"""
+StreamHasher.resume은 hash.copy()와 바이트 오프셋으로 커지는 로그의 새로운 바이트만 이어서 해싱하지만,
+hashlib의 해시 객체는 내부 상태를 직렬화할 수 없기 때문에 프로세스가 재시작되면 처음부터 다시 읽어야 함.
+재시작 후에도 이어서 해싱해야 하는 경우에는 고정 크기 리프의 다이제스트 목록(MerkleTree)을 상태로 저장함.
+저장된 상태에서 다시 시작하면 마지막으로 덜 채워진 리프와 새로 추가된 바이트만 읽음.
+"""
+
+from pathlib import Path
+
+from basic.hash_stream_merkle import MerkleHasher, MerkleTree
+
+
+class LogFollower(object):
+    """Follow an append-only log and keep a resumable digest of it"""
+
+    def __init__(
+        self,
+        path: str | Path,
+        state_path: str | Path | None = None,
+        algorithm: str = "sha256",
+        leaf_size: int = 1024 * 1024,
+    ) -> None:
+        self.path = Path(path)
+        self.state_path = Path(state_path) if state_path is not None else None
+        self.hasher = MerkleHasher(algorithm=algorithm, leaf_size=leaf_size, max_workers=1)
+        self.tree = MerkleTree(algorithm, leaf_size)
+
+        if self.state_path is not None and self.state_path.exists():
+            with open(self.state_path) as f:
+                self.tree = MerkleTree.load(f)
+
+    @property
+    def offset(self) -> int:
+        return self.tree.size
+
+    def poll(self) -> str:
+        """마지막 폴링 이후 추가된 바이트만 해싱하고 현재 다이제스트를 반환함"""
+
+        if self.path.stat().st_size != self.tree.size:
+            self.tree = self.hasher.rehash(self.path, self.tree)
+            self.save()
+
+        return self.tree.hexdigest()
+
+    def save(self) -> None:
+        if self.state_path is None:
+            return
+
+        # 저장 도중 프로세스가 죽어도 이전 상태가 깨지지 않도록 임시 파일에 쓰고 교체함
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            self.tree.dump(f)
+        tmp_path.replace(self.state_path)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = Path(tmp, "app.log")
+        state_path = Path(tmp, "app.log.state")
+        log_path.write_bytes(b"line 1\n" * 1000)
+
+        follower = LogFollower(log_path, state_path, leaf_size=1024)
+        print(follower.poll())
+
+        with open(log_path, "ab") as f:
+            f.write(b"line 2\n" * 1000)
+
+        # 프로세스가 재시작된 상황: 저장된 상태에서 이어서 해싱함
+        restarted = LogFollower(log_path, state_path, leaf_size=1024)
+        print(restarted.offset)
+        # 7000
+        print(restarted.poll() == MerkleHasher(leaf_size=1024)(log_path).hexdigest())
+        # True
@@ -0,0 +1,130 @@
+"""
+chunk_size=4096은 최신 저장 장치와 해시 알고리즘에 비해 너무 작음.
+알고리즘과 스트림 종류(file, pipe, memory)별로 후보 청크 크기를 벤치마크해 가장 빠른 값을 저장해 두고,
+StreamHasher는 chunk_size가 주어지지 않으면 저장된 값을 사용함. 보정 결과가 없으면 DEFAULT_CHUNK_SIZE를 사용함.
+
+    python -m basic.hash_stream_tuning
+"""
+
+import hashlib
+import io
+import json
+import os
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from time import perf_counter
+from typing import IO, Callable
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+CANDIDATES = [2**exp for exp in range(12, 23)]  # 4 KiB ~ 4 MiB
+SOURCES = ("file", "pipe", "memory")
+ALGORITHMS = ("md5", "sha1", "sha256", "blake2b")
+
+TUNING_PATH = Path(
+    os.environ.get("STREAM_HASHER_TUNING", Path.home() / ".cache" / "stream_hasher_tuning.json")
+)
+
+_tuned: dict[str, dict[str, int]] | None = None
+
+
+def source_kind(stream: IO) -> str:
+    """스트림을 file(일반 파일), pipe(파이프, 소켓 등), memory(파일 디스크립터가 없는 스트림)로 분류함"""
+
+    try:
+        mode = os.fstat(stream.fileno()).st_mode
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return "memory"
+
+    return "file" if stat.S_ISREG(mode) else "pipe"
+
+
+def tuned_chunk_size(algorithm: str, source: str) -> int:
+    global _tuned
+
+    if _tuned is None:
+        try:
+            _tuned = json.loads(TUNING_PATH.read_text())
+        except (OSError, ValueError):
+            _tuned = {}
+
+    return _tuned.get(algorithm, {}).get(source, DEFAULT_CHUNK_SIZE)
+
+
+def save(results: dict[str, dict[str, int]]) -> None:
+    global _tuned
+
+    TUNING_PATH.parent.mkdir(parents=True, exist_ok=True)
+    TUNING_PATH.write_text(json.dumps(results, indent=2))
+    _tuned = results
+
+
+def _open_source(source: str, payload: bytes, tmp: str) -> IO[bytes]:
+    if source == "memory":
+        return io.BytesIO(payload)
+
+    if source == "file":
+        path = Path(tmp, "payload.bin")
+        if not path.exists():
+            path.write_bytes(payload)
+        return open(path, "rb")
+
+    read_fd, write_fd = os.pipe()
+
+    def writer() -> None:
+        with open(write_fd, "wb") as f:
+            f.write(payload)
+
+    threading.Thread(target=writer, daemon=True).start()
+    return open(read_fd, "rb")
+
+
+def measure(algorithm: Callable, source: str, chunk_size: int, payload: bytes, tmp: str) -> float:
+    """한 설정의 처리량(MB/s)"""
+
+    # StreamHasher가 이 모듈을 사용하므로 순환 임포트를 피하기 위해 여기서 임포트함
+    from basic.hash_stream_refactored2 import StreamHasher
+
+    hasher = StreamHasher(algorithm=algorithm, chunk_size=chunk_size, mmap_threshold=None)
+    with _open_source(source, payload, tmp) as stream:
+        start = perf_counter()
+        hasher(stream)
+        elapsed = perf_counter() - start
+
+    return len(payload) / (1024 * 1024) / elapsed
+
+
+def calibrate(
+    algorithms: tuple[str, ...] = ALGORITHMS,
+    sources: tuple[str, ...] = SOURCES,
+    size: int = 64 * 1024 * 1024,
+    repeat: int = 3,
+) -> dict[str, dict[str, int]]:
+    payload = os.urandom(size)
+    results: dict[str, dict[str, int]] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in algorithms:
+            algorithm = getattr(hashlib, name)
+            for source in sources:
+                best_size, best_rate = DEFAULT_CHUNK_SIZE, 0.0
+                for chunk_size in CANDIDATES:
+                    rate = max(
+                        measure(algorithm, source, chunk_size, payload, tmp) for _ in range(repeat)
+                    )
+                    print(f"{name:8} {source:7} {chunk_size:>8} {rate:8.1f} MB/s")
+                    if rate > best_rate:
+                        best_size, best_rate = chunk_size, rate
+
+                results.setdefault(name, {})[source] = best_size
+
+    return results
+
+
+if __name__ == "__main__":
+    results = calibrate()
+    save(results)
+
+    print(json.dumps(results, indent=2))
+    print(f"saved to {TUNING_PATH}")
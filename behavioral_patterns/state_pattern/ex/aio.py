@@ -0,0 +1,176 @@
+import asyncio
+from functools import reduce
+from operator import xor
+from typing import Any
+
+from behavioral_patterns.state_pattern.ex.main import CompiledReader, Message, MessagePool
+
+"""
+Reader.read는 동기 이터러블만 받기 때문에 수백 개의 수신기에서 TCP로 들어오는 NMEA를 처리하기 어려움.
+연결마다 CompiledReader를 하나씩 두고 data_received로 받은 청크를 read_chunks에 넣어
+검증된 Message를 모든 연결이 공유하는 MessageQueue로 보냄.
+큐가 maxsize 이상 찬 동안 문장을 넣은 연결만 읽기를 멈추고(pause_reading) 소비자가 low water까지 비우면
+멈춘 순서대로 다시 읽음. 읽기를 멈추면 커널 소켓 버퍼가 차고 TCP 흐름 제어로 수신기 쪽 전송도 느려짐.
+
+__main__은 루프백 부하 테스트로, 수신기마다 전송 시각(perf_counter_ns)을 본문에 담은 문장을 보내고
+소비자가 큐에서 꺼낸 시각과의 차이를 지연 시간으로 측정함.
+수신기 열 개 중 하나는 '*' 없이 80바이트를 넘는 줄과 쓰레기 바이트를 섞어 보내며,
+이런 수신기의 연결도 끊기지 않고 뒤따르는 정상 문장이 모두 전달되어야 함.
+
+    python -m behavioral_patterns.state_pattern.ex.aio [수신기 수] [수신기당 문장 수]
+"""
+
+
+class MessageQueue:
+    """
+    큐가 차면 모든 연결을 한꺼번에 멈췄다가 한꺼번에 재개하면, 재개 직후 이벤트 루프가 먼저 돌려준 몇 연결이
+    큐를 다시 채워 나머지 연결은 여러 번 연달아 기다리게 됨.
+    그래서 큐가 찬 동안 실제로 문장을 넣은 연결만 멈추고, 멈춘 순서(paused의 삽입 순서)대로 재개해
+    가장 오래 기다린 연결이 먼저 읽히게 함. read_stream이 writable.wait()에서 깨어나는 순서와 같음.
+    """
+
+    def __init__(self, maxsize: int = 1024, low_water: int | None = None) -> None:
+        self.maxsize = maxsize
+        self.low_water = maxsize // 2 if low_water is None else low_water
+        # 청크 하나에서 나온 문장들은 버리지 않고 모두 넣으므로 큐 자체는 크기 제한을 두지 않고 maxsize에서 읽기를 멈춤
+        self.items: asyncio.Queue[tuple[Any, Message]] = asyncio.Queue()
+        # dict는 삽입 순서를 지키므로 멈춘 순서대로 재개하는 FIFO로 씀
+        self.paused: dict[asyncio.Transport, None] = {}
+        self.writable = asyncio.Event()
+        self.writable.set()
+        self.pauses = 0
+
+    def qsize(self) -> int:
+        return self.items.qsize()
+
+    def detach(self, transport: asyncio.Transport) -> None:
+        self.paused.pop(transport, None)
+
+    def put_nowait(
+        self, peer: Any, message: Message, transport: asyncio.Transport | None = None
+    ) -> None:
+        self.items.put_nowait((peer, message))
+        if self.writable.is_set() and self.items.qsize() >= self.maxsize:
+            self.writable.clear()
+            self.pauses += 1
+        if not self.writable.is_set() and transport is not None and transport not in self.paused:
+            self.paused[transport] = None
+            transport.pause_reading()
+
+    async def get(self) -> tuple[Any, Message]:
+        item = await self.items.get()
+        if not self.writable.is_set() and self.items.qsize() <= self.low_water:
+            self.writable.set()
+            paused, self.paused = self.paused, {}
+            for transport in paused:
+                if not transport.is_closing():
+                    transport.resume_reading()
+        return item
+
+
+class NMEAProtocol(asyncio.Protocol):
+    def __init__(self, queue: MessageQueue, pool: MessagePool | None = None) -> None:
+        self.queue = queue
+        self.reader = CompiledReader(pool)
+        self.transport: asyncio.Transport | None = None
+        self.peer: Any = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore
+        self.peer = transport.get_extra_info("peername")
+
+    def data_received(self, data: bytes) -> None:
+        for message in self.reader.read_chunks((data,)):
+            self.queue.put_nowait(self.peer, message, self.transport)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        if self.transport is not None:
+            self.queue.detach(self.transport)
+
+
+async def read_stream(
+    stream: asyncio.StreamReader,
+    queue: MessageQueue,
+    peer: Any = None,
+    chunk_size: int = 64 * 1024,
+    pool: MessagePool | None = None,
+) -> None:
+    """
+    asyncio.StreamReader용 front end. 큐가 차 있으면 다음 청크를 읽지 않고 기다리므로
+    StreamReader의 버퍼가 limit를 넘고 StreamReader가 직접 전송 읽기를 멈춤.
+    """
+
+    reader = CompiledReader(pool)
+    while chunk := await stream.read(chunk_size):
+        for message in reader.read_chunks((chunk,)):
+            queue.put_nowait(peer, message)
+        await queue.writable.wait()
+
+
+def sentence(body: bytes) -> bytes:
+    return b"$%s*%02X\r\n" % (body, reduce(xor, body, 0))
+
+
+if __name__ == "__main__":
+    import sys
+    from statistics import quantiles
+    from time import perf_counter_ns
+
+    receivers = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    per_receiver = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    burst = 10
+
+    garbage = b"$GPTXT," + b"x" * 200 + b"\r\n" + b"\x00\xff junk *ZZ\r\n"
+
+    async def receiver(port: int, idx: int) -> None:
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+        noisy = idx % 10 == 0
+        for _ in range(per_receiver // burst):
+            now = perf_counter_ns()
+            sentences = b"".join(sentence(b"GPTXT,%d,%d" % (idx, now)) for _ in range(burst))
+            writer.write(garbage + sentences if noisy else sentences)
+            await writer.drain()
+            await asyncio.sleep(0)
+        writer.close()
+        await writer.wait_closed()
+
+    async def main(front_end: str) -> None:
+        queue = MessageQueue(maxsize=1024)
+        if front_end == "Protocol":
+            loop = asyncio.get_running_loop()
+            server = await loop.create_server(lambda: NMEAProtocol(queue), "127.0.0.1", 0)
+        else:
+
+            async def handle(stream: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+                await read_stream(stream, queue, writer.get_extra_info("peername"))
+                writer.close()
+
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        expected = receivers * (per_receiver // burst * burst)
+        latencies: list[int] = []
+
+        async def consume() -> None:
+            while len(latencies) < expected:
+                _, message = await queue.get()
+                sent = int(message.view().tobytes().rsplit(b",", 1)[1])
+                latencies.append(perf_counter_ns() - sent)
+
+        start = perf_counter_ns()
+        senders = asyncio.gather(*(receiver(port, idx) for idx in range(receivers)))
+        # 끊긴 연결이 있으면 문장이 모자라 끝나지 않으므로 시간 제한을 둠
+        await asyncio.wait_for(consume(), timeout=60)
+        elapsed = (perf_counter_ns() - start) / 1e9
+        await senders
+        server.close()
+        await server.wait_closed()
+
+        p50, p99 = (q / 1e6 for q in quantiles(latencies, n=100)[49::49])
+        print(
+            f"{front_end:12} {receivers} receivers {len(latencies) / elapsed:>8.0f} sentences/s "
+            f"latency p50 {p50:7.2f} ms p99 {p99:7.2f} ms, paused {queue.pauses} times"
+        )
+
+    for front_end in ("Protocol", "StreamReader"):
+        asyncio.run(main(front_end))
@@ -0,0 +1,89 @@
+import re
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from structural_patterns.flyweight_pattern.main import Buffer, Point
+
+"""
+main.py의 플라이웨이트는 문장 하나씩 파싱하기 때문에 Message.from_buffer는 바이트마다 파이썬 루프를 돌고,
+Point.from_bytes는 fix마다 슬라이스를 만들어 float()을 호출함.
+수천만 개의 문장을 재생할 때는 Buffer 전체를 한 번에 훑어 위도, 경도, 문장 종류, 바이트 오프셋을 열 단위 배열로 만드는 편이 나음.
+문장과 필드의 위치는 C로 구현된 정규 표현식 엔진이 한 번의 패스로 찾으므로 바이트 단위의 파이썬 루프가 없음.
+(NumPy를 의존성으로 추가하지 않도록 표준 라이브러리의 array를 사용함. 필요하면 numpy.frombuffer로 복사 없이 변환할 수 있음.)
+"""
+
+SENTENCE_TYPES = (b"GPGLL", b"GPGGA", b"GPRMC")
+
+# 문장 종류마다 위도 필드 앞에 오는 필드의 수가 다르므로 헤더와 함께 그 필드들을 건너뜀
+FIX_PATTERN = re.compile(
+    rb"\$(GPGLL|GPGGA,[^,*$]*|GPRMC,[^,*$]*,[^,*$]*),"
+    rb"(\d{4,}(?:\.\d*)?),([NSns]),(\d{5,}(?:\.\d*)?),([EWew])"
+)
+
+
+@dataclass
+class FixColumns:
+    latitude: array = field(default_factory=lambda: array("d"))
+    longitude: array = field(default_factory=lambda: array("d"))
+    kind: array = field(default_factory=lambda: array("B"))
+    offset: array = field(default_factory=lambda: array("q"))
+
+    def __len__(self) -> int:
+        return len(self.offset)
+
+    def sentence_type(self, idx: int) -> bytes:
+        return SENTENCE_TYPES[self.kind[idx]]
+
+    def extend(self, other: "FixColumns") -> None:
+        self.latitude.extend(other.latitude)
+        self.longitude.extend(other.longitude)
+        self.kind.extend(other.kind)
+        self.offset.extend(other.offset)
+
+    def points(self) -> Iterator[Point]:
+        for latitude, longitude in zip(self.latitude, self.longitude):
+            yield Point(latitude, longitude)
+
+
+def parse_fixes(buffer: Buffer, start: int = 0, end: int | None = None) -> FixColumns:
+    """start 이상 end 미만의 위치에서 시작하는 문장만 파싱함"""
+
+    columns = FixColumns()
+    kinds = {name: idx for idx, name in enumerate(SENTENCE_TYPES)}
+
+    # 열마다 append를 반복하는 대신 지역 변수로 바인딩해 속성 조회 비용을 줄임
+    lat_append = columns.latitude.append
+    lon_append = columns.longitude.append
+    kind_append = columns.kind.append
+    offset_append = columns.offset.append
+
+    for match in FIX_PATTERN.finditer(buffer.content, start):
+        if end is not None and match.start() >= end:
+            break
+
+        header, latitude, n_s, longitude, e_w = match.groups()
+        # Point.from_bytes와 같은 연산 순서를 유지해 결과가 비트 단위로 같도록 함
+        lat_deg = float(latitude[:2]) + float(latitude[2:]) / 60
+        lon_deg = float(longitude[:3]) + float(longitude[3:]) / 60
+        lat_append(lat_deg * (1 if n_s.upper() == b"N" else -1))
+        lon_append(lon_deg * (1 if e_w.upper() == b"E" else -1))
+        kind_append(kinds[header[:5]])
+        offset_append(match.start())
+
+    return columns
+
+
+if __name__ == "__main__":
+    buffer = Buffer(
+        b"$GPGGA,161229.487,3723.2475,N,12158.3416,W,1,07,1.0,9.0,M,,,,0000*18\r\n"
+        b"$GPGLL,3751.65,S,14507.36,E*77\r\n"
+        b"$GPRMC,161229.487,A,3723.2475,N,12158.3416,W,0.13,309.62,120598,,*10\r\n"
+    )
+
+    fixes = parse_fixes(buffer)
+    for idx, point in enumerate(fixes.points()):
+        print(fixes.sentence_type(idx), fixes.offset[idx], point)
+    # b'GPGGA' 0 (37°23.2475N, 121°58.3416W)
+    # b'GPGLL' 70 (37°51.6500S, 145°07.3600E)
+    # b'GPRMC' 102 (37°23.2475N, 121°58.3416W)
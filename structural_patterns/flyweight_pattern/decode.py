@@ -0,0 +1,141 @@
+from array import array
+from itertools import repeat
+from operator import add, getitem, mul, truediv
+from typing import Sequence
+
+from structural_patterns.flyweight_pattern.main import Point
+
+"""
+Point.from_bytes는 좌표마다 bytes 슬라이스 네 개를 만들고 float()을 두 번, 반구 바이트에 upper()를 호출함.
+DDMM.mmmm 숫자를 정수로 읽어 스케일링하는 방식도 시도했지만, CPython에서는 int 연산을 파이썬 코드로 조합하는 비용이
+C로 구현된 float() 한 번보다 커서 오히려 두 배 정도 느렸음.
+그래서 하나짜리 경로는 Buffer에서 필드를 꺼내지 않고 원본 바이트에서 도(deg)와 분(min) 구간을 바로 잘라 float()에 넘기고,
+반구는 upper() 대신 표로 찾음. 배치 경로는 오프셋 배열에 대해 map과 operator 함수만 조합하므로
+fix마다 파이썬 바이트코드가 실행되지 않음.
+두 경로 모두 deg + min / 60에 부호를 곱하는 연산 순서를 그대로 지키므로 Point.from_bytes와 비트 단위로 같은 결과를 냄.
+"""
+
+LAT_SIGNS = {b"N": 1, b"n": 1}
+LON_SIGNS = {b"E": 1, b"e": 1}
+
+
+def decode_coordinate(content: bytes, start: int, end: int, digits: int) -> float:
+    """content[start:end]의 (D)DDMM.mmmm을 도 단위로 바꿈. digits는 도 부분의 자릿수(위도 2, 경도 3)"""
+
+    split = start + digits
+    return float(content[start:split]) + float(content[split:end]) / 60
+
+
+def decode_point(
+    content: bytes,
+    lat_start: int,
+    lat_end: int,
+    n_s: int,
+    lon_start: int,
+    lon_end: int,
+    e_w: int,
+) -> Point:
+    """n_s와 e_w는 반구 문자의 위치"""
+
+    lat_sign = LAT_SIGNS.get(content[n_s : n_s + 1], -1)  # noqa
+    lon_sign = LON_SIGNS.get(content[e_w : e_w + 1], -1)  # noqa
+    return Point(
+        decode_coordinate(content, lat_start, lat_end, 2) * lat_sign,
+        decode_coordinate(content, lon_start, lon_end, 3) * lon_sign,
+    )
+
+
+def _decode_column(
+    content: bytes,
+    starts: Sequence[int],
+    ends: Sequence[int],
+    hemispheres: Sequence[int],
+    digits: int,
+    signs: dict[bytes, int],
+) -> array:
+    split = list(map(add, starts, repeat(digits)))
+    degrees = map(float, map(getitem, repeat(content), map(slice, starts, split)))
+    minutes = map(float, map(getitem, repeat(content), map(slice, split, ends)))
+    hemisphere_ends = map(add, hemispheres, repeat(1))
+    hemisphere = map(getitem, repeat(content), map(slice, hemispheres, hemisphere_ends))
+    values = map(add, degrees, map(truediv, minutes, repeat(60)))
+
+    return array("d", map(mul, values, map(signs.get, hemisphere, repeat(-1))))
+
+
+def decode_batch(
+    content: bytes,
+    lat_starts: Sequence[int],
+    lat_ends: Sequence[int],
+    n_s: Sequence[int],
+    lon_starts: Sequence[int],
+    lon_ends: Sequence[int],
+    e_w: Sequence[int],
+) -> tuple[array, array]:
+    """오프셋 배열로 주어진 필드들을 (위도 배열, 경도 배열)로 한 번에 바꿈"""
+
+    return (
+        _decode_column(content, lat_starts, lat_ends, n_s, 2, LAT_SIGNS),
+        _decode_column(content, lon_starts, lon_ends, e_w, 3, LON_SIGNS),
+    )
+
+
+if __name__ == "__main__":
+    import random
+    import struct
+    from time import perf_counter
+
+    def bits(value: float) -> bytes:
+        return struct.pack("<d", value)
+
+    # 퍼즈 코퍼스: 자릿수, 소수점 유무, 반구 대소문자를 섞은 필드들
+    random.seed(0)
+    fields = []
+    for _ in range(200_000):
+        lat_frac = "".join(random.choices("0123456789", k=random.randint(0, 7)))
+        lon_frac = "".join(random.choices("0123456789", k=random.randint(0, 7)))
+        latitude = f"{random.randint(0, 90):02d}{random.randint(0, 59):02d}" + (
+            f".{lat_frac}" if lat_frac or random.random() < 0.5 else ""
+        )
+        longitude = f"{random.randint(0, 180):03d}{random.randint(0, 59):02d}" + (
+            f".{lon_frac}" if lon_frac or random.random() < 0.5 else ""
+        )
+        n_s, e_w = random.choice("NSns").encode(), random.choice("EWew").encode()
+        fields.append((latitude.encode(), n_s, longitude.encode(), e_w))
+
+    content = bytearray()
+    lat_starts, lat_ends, ns_starts, lon_starts, lon_ends, ew_starts = ([] for _ in range(6))
+    for latitude, n_s, longitude, e_w in fields:
+        lat_starts.append(len(content))
+        content += latitude
+        lat_ends.append(len(content))
+        ns_starts.append(len(content) + 1)
+        content += b"," + n_s + b","
+        lon_starts.append(len(content))
+        content += longitude
+        lon_ends.append(len(content))
+        ew_starts.append(len(content) + 1)
+        content += b"," + e_w + b"\n"
+    content = bytes(content)
+    columns = (lat_starts, lat_ends, ns_starts, lon_starts, lon_ends, ew_starts)
+
+    start = perf_counter()
+    expected = [Point.from_bytes(*field) for field in fields]
+    reference = perf_counter() - start
+
+    start = perf_counter()
+    single = [decode_point(content, *args) for args in zip(*columns)]
+    single_elapsed = perf_counter() - start
+
+    start = perf_counter()
+    latitudes, longitudes = decode_batch(content, *columns)
+    batch_elapsed = perf_counter() - start
+
+    for point, fast, lat, lon in zip(expected, single, latitudes, longitudes):
+        assert bits(point.latitude) == bits(fast.latitude) == bits(lat)
+        assert bits(point.longitude) == bits(fast.longitude) == bits(lon)
+
+    count = len(fields)
+    print(f"{'from_bytes':14} {count / reference:>12.0f} fixes/s")
+    print(f"{'decode_point':14} {count / single_elapsed:>12.0f} fixes/s")
+    print(f"{'decode_batch':14} {count / batch_elapsed:>12.0f} fixes/s")
@@ -7,6 +7,21 @@ from typing import Iterator, Sequence
 from typing_extensions import overload
 
 
+def format_point(latitude: float, longitude: float) -> str:
+    lat = abs(latitude)
+    lat_deg = floor(lat)
+    lat_min_sec = 60 * (lat - lat_deg)
+    lat_dir = "N" if latitude > 0 else "S"
+    lon = abs(longitude)
+    lon_deg = floor(lon)
+    lon_min_sec = 60 * (lon - lon_deg)
+    lon_dir = "E" if longitude > 0 else "W"
+    return (
+        f"({lat_deg:02.0f}°{lat_min_sec:07.4f}{lat_dir}, "
+        f"{lon_deg:03.0f}°{lon_min_sec:07.4f}{lon_dir})"
+    )
+
+
 @dataclass(frozen=True)
 class Point:
     latitude: float
@@ -15,11 +30,13 @@ class Point:
     @classmethod
     def from_bytes(
         cls,
-        latitude: bytes,
-        N_S: bytes,
-        longitude: bytes,
-        E_W: bytes,
+        latitude: bytes | memoryview,
+        N_S: bytes | memoryview,
+        longitude: bytes | memoryview,
+        E_W: bytes | memoryview,
     ) -> "Point":
+        # MappedBuffer의 필드는 memoryview이고, float()과 upper()는 bytes만 받음
+        latitude, N_S, longitude, E_W = map(bytes, (latitude, N_S, longitude, E_W))
         lat_deg = float(latitude[:2]) + float(latitude[2:]) / 60
         lat_sign = 1 if N_S.upper() == b"N" else -1
         lon_deg = float(longitude[:3]) + float(longitude[3:]) / 60
@@ -27,18 +44,7 @@ class Point:
         return Point(lat_deg * lat_sign, lon_deg * lon_sign)
 
     def __str__(self) -> str:
-        lat = abs(self.latitude)
-        lat_deg = floor(lat)
-        lat_min_sec = 60 * (lat - lat_deg)
-        lat_dir = "N" if self.latitude > 0 else "S"
-        lon = abs(self.longitude)
-        lon_deg = floor(lon)
-        lon_min_sec = 60 * (lon - lon_deg)
-        lon_dir = "E" if self.longitude > 0 else "W"
-        return (
-            f"({lat_deg:02.0f}°{lat_min_sec:07.4f}{lat_dir}, "
-            f"{lon_deg:03.0f}°{lon_min_sec:07.4f}{lon_dir})"
-        )
+        return format_point(self.latitude, self.longitude)
 
     @property
     def lat(self) -> float:
@@ -70,11 +76,13 @@ class Buffer(Sequence[int]):
 
 
 class Message(ABC):
+    header: bytes
+
     def __init__(self) -> None:
         self.buffer: weakref.ReferenceType[Buffer]
         self.offset: int
         self.end: int | None
-        self.commas: list[int]
+        self.commas: Sequence[int]
 
     def from_buffer(self, buffer: Buffer, offset: int) -> "Message":
         # Buffer 객체가 사용되는 위치를 추적하기 위해 사용되지 않으므로 Message 객체가 여전히 신선하지 않은 참조를 갖고 있는 경우에도 Buffer 객체를 제거할 수 있게 해줌.
@@ -96,13 +104,27 @@ class Message(ABC):
 
         return self
 
-    def __getitem__(self, field: int) -> bytes:
+    def bind(self, buffer: Buffer, commas: Sequence[int], end: int) -> "Message":
+        """미리 계산된 구분자 위치(commas[0]은 '$'의 위치)로 바인딩하므로 바이트를 다시 훑지 않음"""
+
+        self.buffer = weakref.ref(buffer)
+        self.offset = commas[0]
+        self.end = end
+        self.commas = commas
+
+        return self
+
+    def __getitem__(self, field: int) -> bytes | memoryview:
         if not hasattr(self, "buffer") or (buffer := self.buffer()) is None:
             raise RuntimeError("Broken reference")
 
         start, end = self.commas[field] + 1, self.commas[field + 1]
         return buffer[start:end]
 
+
+class FixMessage(Message):
+    """위치(fix)를 담고 있는 문장. 문장 종류마다 위도와 경도 필드의 위치가 다름"""
+
     def get_fix(self) -> Point:
         return Point.from_bytes(self.latitude(), self.lat_n_s(), self.longitude(), self.lon_e_w())
 
@@ -119,13 +141,15 @@ class Message(ABC):
     def lon_e_w(self) -> bytes: ...  # noqa
 
 
-class GPGLL(Message):
+class GPGLL(FixMessage):
     """
     __getitem__ 메서드를 통해 전체 바이트 시퀀스에서 네 개의 특정 필드에 대한 바이트를 선택함.
     __getitem__ 메서드는 Buffer 객체에 대한 참조를 사용하기 때문에 전체 메시지의 바이트 시퀀스를 복제할 필요가 없음.
     대신 Buffer 객체에 다시 접근해 데이터를 가져오기 때문에 메모리를 복잡하게 만드는 것을 방지함.
     """
 
+    header = b"GPGLL"
+
     def latitude(self) -> bytes:
         return self[1]
 
@@ -139,10 +163,90 @@ class GPGLL(Message):
         return self[4]
 
 
+class GPGGA(FixMessage):
+    header = b"GPGGA"
+
+    def latitude(self) -> bytes:
+        return self[2]
+
+    def lat_n_s(self) -> bytes:
+        return self[3]
+
+    def longitude(self) -> bytes:
+        return self[4]
+
+    def lon_e_w(self) -> bytes:
+        return self[5]
+
+
+class GPRMC(FixMessage):
+    header = b"GPRMC"
+
+    def latitude(self) -> bytes:
+        return self[3]
+
+    def lat_n_s(self) -> bytes:
+        return self[4]
+
+    def longitude(self) -> bytes:
+        return self[5]
+
+    def lon_e_w(self) -> bytes:
+        return self[6]
+
+
+class GPVTG(Message):
+    """위치 없이 진행 방향과 속도만 담고 있는 문장"""
+
+    header = b"GPVTG"
+
+    def true_track(self) -> bytes:
+        return self[1]
+
+    def magnetic_track(self) -> bytes:
+        return self[3]
+
+    def speed_knots(self) -> bytes:
+        return self[5]
+
+    def speed_kmh(self) -> bytes:
+        return self[7]
+
+
+class GPGSA(Message):
+    """위치 없이 측위 모드와 사용 중인 위성, DOP를 담고 있는 문장"""
+
+    header = b"GPGSA"
+
+    def mode(self) -> bytes:
+        return self[1]
+
+    def fix_type(self) -> bytes:
+        return self[2]
+
+    def satellites(self) -> list[bytes]:
+        return [sv for field in range(3, 15) if (sv := self[field])]
+
+    def pdop(self) -> bytes:
+        return self[15]
+
+    def hdop(self) -> bytes:
+        return self[16]
+
+    def vdop(self) -> bytes:
+        return self[17]
+
+
+# 5바이트 헤더로 O(1)에 디스패치하는 등록부
+MESSAGE_TYPES: dict[bytes, type[Message]] = {
+    cls.header: cls for cls in (GPGLL, GPGGA, GPRMC, GPVTG, GPGSA)
+}
+
+
 def message_factory(header: bytes) -> Message | None:
-    if header == b"GPGLL":
-        return GPGLL()
-    return None
+    if (cls := MESSAGE_TYPES.get(header)) is None:
+        return None
+    return cls()
 
 
 if __name__ == "__main__":
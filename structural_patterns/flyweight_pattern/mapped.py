@@ -0,0 +1,101 @@
+import mmap
+import os
+from pathlib import Path
+from typing import Iterator
+
+from typing_extensions import Self, overload
+
+from structural_patterns.flyweight_pattern.main import Buffer, message_factory
+
+"""
+Buffer는 메모리에 올라온 bytes를 감싸기 때문에 로그 파일 전체를 먼저 읽어야 함.
+MappedBuffer는 같은 Sequence[int]와 슬라이스 인터페이스를 mmap 위에 구현하므로 운영체제가 필요한 페이지만 올림.
+슬라이스는 memoryview로 반환하므로 Message.__getitem__으로 필드를 꺼낼 때도 복사가 일어나지 않고,
+20GB 로그를 파싱하더라도 사용하는 메모리의 양은 일정함.
+"""
+
+
+class MappedBuffer(Buffer):
+    def __init__(self, path: str | Path) -> None:
+        self.content: mmap.mmap | bytes
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # 빈 파일(막 로테이트된 로그 등)은 mmap할 수 없으므로 빈 bytes로 대신함
+                self.content = b""
+            else:
+                # 매핑은 파일 디스크립터를 닫아도 유지됨
+                self.content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.content)
+
+    def __iter__(self) -> Iterator[int]:
+        # mmap을 직접 순회하면 길이가 1인 bytes가 나오므로 memoryview를 통해 int를 순회함
+        return iter(self.view)
+
+    @overload
+    def __getitem__(self, idx: int) -> int: ...  # noqa
+
+    @overload
+    def __getitem__(self, idx: slice) -> memoryview: ...  # noqa
+
+    def __getitem__(self, idx: int | slice) -> int | memoryview:
+        return self.view[idx]
+
+    def index(self, value: int, start: int = 0, stop: int | None = None) -> int:
+        """Sequence.index는 바이트마다 파이썬 루프를 돌기 때문에 mmap.find로 대신함"""
+
+        idx = self.content.find(bytes((value,)), start, len(self) if stop is None else stop)
+        if idx == -1:
+            raise ValueError(f"{value!r} is not in buffer")
+
+        return idx
+
+    def close(self) -> bool:
+        """
+        매핑을 닫고 True를 돌려줌.
+        __getitem__이 돌려준 memoryview 슬라이스가 아직 살아 있으면 매핑을 닫을 수 없으므로(BufferError)
+        버퍼를 열린 상태 그대로 두고 False를 돌려줌. 이때 매핑은 슬라이스와 이 객체가 모두 사라질 때 GC가 닫음.
+        """
+
+        if not isinstance(self.content, mmap.mmap):
+            self.view.release()
+            return True
+
+        # 매핑을 닫으려면 먼저 self.view를 놓아야 하므로, 닫지 못하면 뷰를 다시 만들어 버퍼를 온전히 되돌림
+        self.view.release()
+        try:
+            self.content.close()
+        except BufferError:
+            self.view = memoryview(self.content)
+            return False
+
+        return True
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp, "gps.log")
+        path.write_bytes(
+            b"$GPGLL,3751.65,S,14507.36,E*77\r\n"
+            b"$GPGLL,3723.2475,N,12158.3416,W,161229.487,A,A*41\r\n"
+        )
+
+        with MappedBuffer(path) as buffer:
+            start = 0
+            flyweight = message_factory(buffer[start + 1 : start + 6])  # noqa
+            print(flyweight.from_buffer(buffer, start).get_fix())
+            # (37°51.6500S, 145°07.3600E)
+
+            print(type(flyweight.latitude()).__name__)
+            # memoryview
+
+            next_start = buffer.index(ord(b"$"), flyweight.end)
+            print(flyweight.from_buffer(buffer, next_start).get_fix())
+            # (37°23.2475N, 121°58.3416W)
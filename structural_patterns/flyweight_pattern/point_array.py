@@ -0,0 +1,152 @@
+from array import array
+from itertools import repeat
+from math import asin, atan2, cos, degrees, radians, sin, sqrt
+from typing import Iterable, Iterator, Sequence
+
+from typing_extensions import overload
+
+from structural_patterns.flyweight_pattern.batch import FixColumns
+from structural_patterns.flyweight_pattern.main import Point, format_point
+
+"""
+수백만 개의 frozen dataclass Point는 객체마다 100바이트가 넘고, lat/lon 프로퍼티는 객체마다 radians()를 호출함.
+PointArray는 위도와 경도를 float64 배열 두 개에 담아 점 하나에 16바이트만 사용하고,
+연산은 객체를 만들지 않고 배열 전체에 대해 map과 zip으로 한 번에 수행함.
+(NumPy 없이 표준 라이브러리의 array를 사용함.)
+"""
+
+EARTH_RADIUS = 6_371_008.8  # 평균 지구 반지름(m)
+
+
+def _haversine(a_lat: float, a_lon: float, b_lat: float, b_lon: float) -> float:
+    h = sin((b_lat - a_lat) / 2) ** 2 + cos(a_lat) * cos(b_lat) * sin((b_lon - a_lon) / 2) ** 2
+    return 2 * EARTH_RADIUS * asin(sqrt(h))
+
+
+def _bearing(a_lat: float, a_lon: float, b_lat: float, b_lon: float) -> float:
+    y = sin(b_lon - a_lon) * cos(b_lat)
+    x = cos(a_lat) * sin(b_lat) - sin(a_lat) * cos(b_lat) * cos(b_lon - a_lon)
+    return degrees(atan2(y, x)) % 360
+
+
+class PointArray(Sequence[Point]):
+    def __init__(self, latitude: Iterable[float] = (), longitude: Iterable[float] = ()) -> None:
+        self.latitude = array("d", latitude)
+        self.longitude = array("d", longitude)
+
+        if len(self.latitude) != len(self.longitude):
+            raise ValueError("latitude and longitude must have the same length")
+
+    @classmethod
+    def from_points(cls, points: Iterable[Point]) -> "PointArray":
+        result = cls()
+        for point in points:
+            result.append(point)
+
+        return result
+
+    @classmethod
+    def from_fixes(cls, fixes: FixColumns) -> "PointArray":
+        """parse_fixes의 열을 그대로 가져옴"""
+
+        return cls(fixes.latitude, fixes.longitude)
+
+    def append(self, point: Point) -> None:
+        self.latitude.append(point.latitude)
+        self.longitude.append(point.longitude)
+
+    def __len__(self) -> int:
+        return len(self.latitude)
+
+    def __iter__(self) -> Iterator[Point]:
+        return map(Point, self.latitude, self.longitude)
+
+    @overload
+    def __getitem__(self, idx: int) -> Point: ...  # noqa
+
+    @overload
+    def __getitem__(self, idx: slice) -> "PointArray": ...  # noqa
+
+    def __getitem__(self, idx: int | slice) -> "Point | PointArray":
+        if isinstance(idx, slice):
+            return PointArray(self.latitude[idx], self.longitude[idx])
+
+        return Point(self.latitude[idx], self.longitude[idx])
+
+    @property
+    def lat(self) -> array:
+        return array("d", map(radians, self.latitude))
+
+    @property
+    def lon(self) -> array:
+        return array("d", map(radians, self.longitude))
+
+    def _other(self, other: "Point | PointArray") -> tuple[Iterable[float], Iterable[float]]:
+        """다른 점 하나 또는 같은 길이의 PointArray를 라디안 열로 바꿈"""
+
+        if isinstance(other, Point):
+            return repeat(other.lat, len(self)), repeat(other.lon, len(self))
+
+        if len(other) != len(self):
+            raise ValueError("PointArray lengths differ")
+
+        return other.lat, other.lon
+
+    def haversine(self, other: "Point | PointArray") -> array:
+        """각 점과 other(점 하나 또는 같은 위치의 점) 사이의 대원 거리(m)"""
+
+        lat2, lon2 = self._other(other)
+        return array("d", map(_haversine, self.lat, self.lon, lat2, lon2))
+
+    def bearing(self, other: "Point | PointArray") -> array:
+        """각 점에서 other를 향하는 초기 방위각(도, 0 ~ 360)"""
+
+        lat2, lon2 = self._other(other)
+        return array("d", map(_bearing, self.lat, self.lon, lat2, lon2))
+
+    def bbox(self) -> tuple[Point, Point]:
+        """(남서쪽 모서리, 북동쪽 모서리)"""
+
+        if not self:
+            raise ValueError("bbox of empty PointArray")
+
+        return (
+            Point(min(self.latitude), min(self.longitude)),
+            Point(max(self.latitude), max(self.longitude)),
+        )
+
+    def format(self) -> list[str]:
+        """Point.__str__과 같은 형식의 문자열을 Point 객체를 만들지 않고 한 번에 만듦"""
+
+        return list(map(format_point, self.latitude, self.longitude))
+
+    def __str__(self) -> str:
+        return "\n".join(self.format())
+
+
+if __name__ == "__main__":
+    from structural_patterns.flyweight_pattern.batch import parse_fixes
+    from structural_patterns.flyweight_pattern.main import Buffer
+
+    buffer = Buffer(
+        b"$GPGGA,161229.487,3723.2475,N,12158.3416,W,1,07,1.0,9.0,M,,,,0000*18\r\n"
+        b"$GPGLL,3751.65,S,14507.36,E*77\r\n"
+        b"$GPRMC,161229.487,A,3723.2475,N,12158.3416,W,0.13,309.62,120598,,*10\r\n"
+    )
+    points = PointArray.from_fixes(parse_fixes(buffer))
+
+    print(points)
+    # (37°23.2475N, 121°58.3416W)
+    # (37°51.6500S, 145°07.3600E)
+    # (37°23.2475N, 121°58.3416W)
+
+    sydney = Point(-33.8688, 151.2093)
+    print([round(d / 1000) for d in points.haversine(sydney)])
+    # [11961, 705, 11961]
+    print([round(b) for b in points.bearing(sydney)])
+    # [240, 53, 240]
+    print(points.bbox())
+    # (Point(latitude=-37.86083333333333, longitude=-121.97236),
+    #  Point(latitude=37.387458333333335, longitude=145.12266666666667))
+    print(list(points) == list(PointArray.from_points(points)))
+    # True
@@ -0,0 +1,107 @@
+import sys
+import tracemalloc
+from array import array
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, NamedTuple
+
+from structural_patterns.flyweight_pattern.main import Point as FrozenPoint
+from structural_patterns.flyweight_pattern.point_array import PointArray
+from structural_patterns.flyweight_pattern.slots import Point as SlotsPoint
+
+"""
+slots.py는 __slots__와 NamedTuple이 main.py의 dataclass Point보다 메모리를 아낀다고 설명하지만 측정한 값은 없음.
+표현마다 N개의 점을 만들고 tracemalloc으로 점 하나당 바이트, 생성 시간, 속성 접근 시간을 측정함.
+
+    python -m structural_patterns.flyweight_pattern.point_memory [N]
+"""
+
+
+@dataclass(slots=True, frozen=True)
+class DataclassSlotsPoint:
+    latitude: float
+    longitude: float
+
+
+class NamedTuplePoint(NamedTuple):
+    latitude: float
+    longitude: float
+
+
+def build_objects(cls: Callable) -> Callable[[array, array], list]:
+    def build(latitude: array, longitude: array) -> list:
+        return list(map(cls, latitude, longitude))
+
+    return build
+
+
+def build_columns(latitude: array, longitude: array) -> PointArray:
+    columns = PointArray()
+    columns.latitude = array("d", latitude)
+    columns.longitude = array("d", longitude)
+    return columns
+
+
+def access_objects(points: list) -> float:
+    total = 0.0
+    for point in points:
+        total += point.latitude + point.longitude
+    return total
+
+
+def access_columns(points: PointArray) -> float:
+    total = 0.0
+    for latitude, longitude in zip(points.latitude, points.longitude):
+        total += latitude + longitude
+    return total
+
+
+REPRESENTATIONS = {
+    "frozen dataclass": (build_objects(FrozenPoint), access_objects),
+    "__slots__ class": (build_objects(SlotsPoint), access_objects),
+    "dataclass(slots)": (build_objects(DataclassSlotsPoint), access_objects),
+    "NamedTuple": (build_objects(NamedTuplePoint), access_objects),
+    "array columns": (build_columns, access_columns),
+}
+
+
+if __name__ == "__main__":
+    import random
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    random.seed(0)
+    # 입력은 array에 담아 두므로 객체 표현에서는 점마다 새로 만들어지는 float 객체도 함께 셈
+    latitude = array("d", (random.uniform(-90, 90) for _ in range(count)))
+    longitude = array("d", (random.uniform(-180, 180) for _ in range(count)))
+
+    print(
+        f"{'representation':18} {'bytes/point':>12} {'build ns/point':>15} {'access ns/point':>16}"
+    )
+    for name, (build, access) in REPRESENTATIONS.items():
+        # tracemalloc은 할당마다 비용이 들기 때문에 시간과 메모리는 따로 측정함
+        start = perf_counter()
+        points = build(latitude, longitude)
+        build_elapsed = perf_counter() - start
+        del points
+
+        tracemalloc.start()
+        points = build(latitude, longitude)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = perf_counter()
+        access(points)
+        access_elapsed = perf_counter() - start
+        del points
+
+        print(
+            f"{name:18} {size / count:>12.1f} {build_elapsed / count * 1e9:>15.1f} "
+            f"{access_elapsed / count * 1e9:>16.1f}"
+        )
+
+    # representation      bytes/point  build ns/point  access ns/point
+    # frozen dataclass          144.4          1563.8             52.9
+    # __slots__ class           104.4           831.0             50.7
+    # dataclass(slots)          104.4          1362.3             49.7
+    # NamedTuple                120.4          1064.6             72.3
+    # array columns              16.0             3.3             83.8
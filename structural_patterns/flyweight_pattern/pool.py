@@ -0,0 +1,119 @@
+from typing import Iterator
+
+from structural_patterns.flyweight_pattern.main import (
+    MESSAGE_TYPES,
+    Buffer,
+    FixMessage,
+    Message,
+    message_factory,
+)
+
+"""
+message_factory는 헤더를 만날 때마다 새로운 Message 객체를 할당함.
+플라이웨이트의 요점은 버퍼를 훑는 동안 가벼운 객체 하나를 재사용하는 것이므로,
+문장 종류별로 Message 객체의 풀을 두고 반환된 객체를 from_buffer로 다시 바인딩해 사용함.
+"""
+
+
+class MessagePool:
+    def __init__(self, registry: dict[bytes, type[Message]] = MESSAGE_TYPES) -> None:
+        self.registry = registry
+        self.free: dict[bytes, list[Message]] = {header: [] for header in registry}
+        self.allocated = 0
+
+    def acquire(self, header: bytes) -> Message | None:
+        if (free := self.free.get(header)) is None:
+            return None
+
+        if free:
+            return free.pop()
+
+        self.allocated += 1
+        return self.registry[header]()
+
+    def release(self, message: Message) -> None:
+        self.free[message.header].append(message)
+
+    def scan(self, buffer: Buffer) -> Iterator[Message]:
+        """
+        버퍼의 모든 문장을 차례로 바인딩해 돌려줌.
+        돌려받은 객체는 다음 문장을 위해 바로 재사용되므로 값을 보관하려면 get_fix() 등으로 꺼내야 함.
+        """
+
+        content = buffer.content
+        start = content.find(b"$")
+        while start != -1:
+            message = self.acquire(buffer[start + 1 : start + 6])  # noqa
+            end = start + 1
+            if message is not None:
+                try:
+                    message.from_buffer(buffer, start)
+                except IndexError:
+                    # 버퍼 끝에서 잘린 문장
+                    self.release(message)
+                    return
+                except ValueError:
+                    # 82바이트 안에 '*'가 없는 깨진 문장은 건너뜀
+                    self.release(message)
+                else:
+                    end = message.end
+                    yield message
+                    self.release(message)
+
+            start = content.find(b"$", end)
+
+
+if __name__ == "__main__":
+    from time import perf_counter
+
+    sentences = [
+        b"$GPGGA,161229.487,3723.2475,N,12158.3416,W,1,07,1.0,9.0,M,,,,0000*18\r\n",
+        b"$GPGLL,3751.65,S,14507.36,E*77\r\n",
+        b"$GPRMC,161229.487,A,3723.2475,N,12158.3416,W,0.13,309.62,120598,,*10\r\n",
+        b"$GPVTG,309.62,T,,M,0.13,N,0.2,K*6E\r\n",
+        b"$GPGSA,A,3,07,02,26,27,09,04,15,,,,,,1.8,1.0,1.5*33\r\n",
+    ]
+    count = 200_000
+    buffer = Buffer(b"".join(sentences) * (count // len(sentences)))
+
+    # 기존 팩토리가 만드는 Message 객체의 수를 세기 위해 __init__을 감쌈
+    created = 0
+    message_init = Message.__init__
+
+    def counting_init(self: Message) -> None:
+        global created
+        created += 1
+        message_init(self)
+
+    Message.__init__ = counting_init  # type: ignore[method-assign]
+
+    start = perf_counter()
+    offset = 0
+    while offset != -1:
+        flyweight = message_factory(buffer[offset + 1 : offset + 6])  # noqa
+        flyweight.from_buffer(buffer, offset)
+        if isinstance(flyweight, FixMessage):
+            flyweight.get_fix()
+        offset = buffer.content.find(b"$", flyweight.end)
+    factory_elapsed = perf_counter() - start
+    factory_created = created
+
+    created = 0
+    pool = MessagePool()
+    start = perf_counter()
+    for message in pool.scan(buffer):
+        if isinstance(message, FixMessage):
+            message.get_fix()
+    pool_elapsed = perf_counter() - start
+    pool_created = created
+
+    Message.__init__ = message_init  # type: ignore[method-assign]
+
+    scale = 1_000_000 / count
+    print(f"{'':16} {'sentences/s':>12} {'allocs/1M':>10}")
+    print(
+        f"{'message_factory':16} {count / factory_elapsed:>12.0f} {factory_created * scale:>10.0f}"
+    )
+    print(f"{'MessagePool':16} {count / pool_elapsed:>12.0f} {pool_created * scale:>10.0f}")
+    # message_factory       ...    1000000
+    # MessagePool           ...         25
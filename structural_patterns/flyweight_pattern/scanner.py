@@ -0,0 +1,115 @@
+import re
+from array import array
+from typing import Iterator
+
+from structural_patterns.flyweight_pattern.main import Buffer, Message
+from structural_patterns.flyweight_pattern.pool import MessagePool
+
+"""
+Message.from_buffer는 최대 82바이트를 buffer[idx] == ord(b",")로 훑기 때문에 바이트마다 Buffer.__getitem__을 거쳐
+파이썬 호출이 세 번씩 일어남.
+버퍼 전체에서 '$', ',', '*'의 위치를 정규 표현식으로 한 번에 찾아 두면 바이트가 아닌 구분자 단위로만 파이썬 코드가 실행되고,
+각 Message는 미리 계산된 구분자 구간의 memoryview에 O(1)로 바인딩됨.
+"""
+
+DELIMITERS = re.compile(rb"[$,*]")
+DOLLAR, STAR = ord(b"$"), ord(b"*")
+MAX_LENGTH = 82
+
+
+class SentenceIndex:
+    def __init__(self, buffer: Buffer) -> None:
+        self.buffer = buffer
+        # 모든 문장의 구분자 위치를 이어 붙인 배열. 문장마다 '$' 위치로 시작해 '*' 위치로 끝남
+        self.delimiters = array("q")
+        # 문장 i의 구분자는 delimiters[bounds[2 * i] : bounds[2 * i + 1]]
+        self.bounds = array("q")
+        self._scan()
+
+    def _scan(self) -> None:
+        content = self.buffer.content
+        delimiters, bounds = self.delimiters, self.bounds
+        append = delimiters.append
+        sentence = -1
+
+        for match in DELIMITERS.finditer(content):
+            pos = match.start()
+            char = content[pos]
+
+            if char == DOLLAR:
+                # '*' 없이 끝난 이전 문장은 버림
+                if sentence >= 0:
+                    del delimiters[sentence:]
+                sentence = len(delimiters)
+                append(pos)
+            elif sentence >= 0:
+                append(pos)
+                if char == STAR:
+                    start = delimiters[sentence]
+                    if pos + 3 <= len(content) and pos - start < MAX_LENGTH:
+                        bounds.append(sentence)
+                        bounds.append(len(delimiters))
+                    else:
+                        del delimiters[sentence:]
+                    sentence = -1
+
+        if sentence >= 0:
+            del delimiters[sentence:]
+
+    def __len__(self) -> int:
+        return len(self.bounds) // 2
+
+    @property
+    def starts(self) -> list[int]:
+        return [self.delimiters[self.bounds[idx]] for idx in range(0, len(self.bounds), 2)]
+
+    def __iter__(self) -> Iterator[tuple[memoryview, int]]:
+        """문장마다 (구분자 위치의 memoryview, 문장 끝 위치)를 돌려줌"""
+
+        view = memoryview(self.delimiters)
+        for idx in range(0, len(self.bounds), 2):
+            commas = view[self.bounds[idx] : self.bounds[idx + 1]]  # noqa
+            yield commas, commas[-1] + 3
+
+    def messages(self, pool: MessagePool) -> Iterator[Message]:
+        content = self.buffer.content
+        for commas, end in self:
+            start = commas[0]
+            if (message := pool.acquire(content[start + 1 : start + 6])) is None:  # noqa
+                continue
+            yield message.bind(self.buffer, commas, end)
+            pool.release(message)
+
+
+if __name__ == "__main__":
+    from time import perf_counter
+
+    from structural_patterns.flyweight_pattern.main import FixMessage
+
+    sentences = [
+        b"$GPGGA,161229.487,3723.2475,N,12158.3416,W,1,07,1.0,9.0,M,,,,0000*18\r\n",
+        b"$GPGLL,3751.65,S,14507.36,E*77\r\n",
+        b"$GPRMC,161229.487,A,3723.2475,N,12158.3416,W,0.13,309.62,120598,,*10\r\n",
+        b"$GPVTG,309.62,T,,M,0.13,N,0.2,K*6E\r\n",
+        b"$GPGSA,A,3,07,02,26,27,09,04,15,,,,,,1.8,1.0,1.5*33\r\n",
+    ]
+    count = 200_000
+    buffer = Buffer(b"".join(sentences) * (count // len(sentences)))
+
+    def fixes(messages: Iterator[Message]) -> list:
+        return [message.get_fix() for message in messages if isinstance(message, FixMessage)]
+
+    start = perf_counter()
+    expected = fixes(MessagePool().scan(buffer))
+    scan_elapsed = perf_counter() - start
+
+    start = perf_counter()
+    index = SentenceIndex(buffer)
+    index_elapsed = perf_counter() - start
+    result = fixes(index.messages(MessagePool()))
+    bind_elapsed = perf_counter() - start
+
+    assert result == expected
+    print(f"{'from_buffer':12} {count / scan_elapsed:>10.0f} sentences/s")
+    print(f"{'index only':12} {count / index_elapsed:>10.0f} sentences/s")
+    print(f"{'index + bind':12} {count / bind_elapsed:>10.0f} sentences/s")
@@ -0,0 +1,75 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from structural_patterns.flyweight_pattern.batch import FixColumns, parse_fixes
+from structural_patterns.flyweight_pattern.mapped import MappedBuffer
+
+"""
+프로세스 하나로 파싱하면 코어 하나가 한계임.
+큰 로그 파일을 바이트 구간으로 나누되 각 경계를 다음 '$' 문장 시작 위치에 맞추고,
+워커마다 같은 파일을 mmap으로 매핑해(페이지 캐시를 공유함) 자기 구간에서 시작하는 문장만 파싱한 뒤 파일 순서대로 합침.
+문장은 '$'로 시작하고 경계도 '$'에 맞추므로 어떤 문장도 두 샤드에 걸치지 않고, 결과는 순차 파서와 같음.
+"""
+
+
+def shard_bounds(path: str | Path, shards: int) -> list[tuple[int, int]]:
+    with MappedBuffer(path) as buffer:
+        size = len(buffer)
+        starts = [0]
+        for idx in range(1, shards):
+            start = buffer.content.find(b"$", max(starts[-1], size * idx // shards))
+            if start == -1:
+                break
+            if start > starts[-1]:
+                starts.append(start)
+
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def parse_shard(path: str | Path, start: int, end: int) -> FixColumns:
+    with MappedBuffer(path) as buffer:
+        return parse_fixes(buffer, start, end)
+
+
+def parse_file(path: str | Path, workers: int | None = None) -> FixColumns:
+    workers = workers or os.cpu_count() or 1
+    # 작업량을 고르게 나누기 위해 워커 수보다 조금 더 잘게 나눔
+    bounds = shard_bounds(path, workers * 4)
+
+    result = FixColumns()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(parse_shard, path, start, end) for start, end in bounds]
+        # 제출한 순서(파일 순서)대로 합침
+        for future in futures:
+            result.extend(future.result())
+
+    return result
+
+
+if __name__ == "__main__":
+    import tempfile
+    from time import perf_counter
+
+    sentences = [
+        b"$GPGGA,161229.487,3723.2475,N,12158.3416,W,1,07,1.0,9.0,M,,,,0000*18\r\n",
+        b"$GPGLL,3751.65,S,14507.36,E*77\r\n",
+        b"$GPRMC,161229.487,A,3723.2475,N,12158.3416,W,0.13,309.62,120598,,*10\r\n",
+        b"$GPVTG,309.62,T,,M,0.13,N,0.2,K*6E\r\n",
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp, "gps.log")
+        path.write_bytes(b"".join(sentences) * 500_000)
+
+        start = perf_counter()
+        expected = parse_shard(path, 0, path.stat().st_size)
+        sequential = perf_counter() - start
+        print(f"{'sequential':12} {len(expected) / sequential:>12.0f} fixes/s")
+
+        for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+            start = perf_counter()
+            result = parse_file(path, workers)
+            elapsed = perf_counter() - start
+            assert result == expected
+            print(f"{workers:>2} workers   {len(result) / elapsed:>12.0f} fixes/s")
@@ -0,0 +1,170 @@
+from array import array
+from collections import defaultdict
+from heapq import nsmallest
+from math import asin, ceil, cos, degrees, floor, pi, radians, sin
+from typing import Iterable, Iterator
+
+from structural_patterns.flyweight_pattern.batch import FixColumns
+from structural_patterns.flyweight_pattern.main import Point
+from structural_patterns.flyweight_pattern.point_array import EARTH_RADIUS, PointArray, _haversine
+
+"""
+파싱한 fix에 대해 지오펜스나 'X에 가장 가까운 fix' 질의를 선형 탐색으로 처리하면 점의 수에 비례해 느려짐.
+GridIndex는 위도와 경도를 고정 크기(도)의 격자로 나누고 셀마다 점의 인덱스를 담아 두는 공간 인덱스임.
+셀에 점을 추가하는 것은 O(1)이므로 스트리밍 파서에서 점진적으로 넣기 좋고,
+질의는 겹치는 셀만 확인한 뒤 반경 질의는 haversine 거리로 다시 걸러냄.
+"""
+
+HALF_CIRCUMFERENCE = pi * EARTH_RADIUS
+
+
+class GridIndex:
+    def __init__(self, cell_size: float = 0.1) -> None:
+        self.cell_size = cell_size
+        self.columns = ceil(360 / cell_size)
+        self.points = PointArray()
+        # 셀마다 파이썬 int 리스트 대신 array('q')에 인덱스를 담아 점 하나에 8바이트만 사용함
+        self.cells: dict[tuple[int, int], array] = defaultdict(lambda: array("q"))
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _row(self, latitude: float) -> int:
+        return floor((latitude + 90) / self.cell_size)
+
+    def _column(self, longitude: float) -> int:
+        return floor((longitude + 180) / self.cell_size) % self.columns
+
+    def insert(self, point: Point) -> int:
+        idx = len(self.points)
+        self.points.append(point)
+        self.cells[self._row(point.latitude), self._column(point.longitude)].append(idx)
+
+        return idx
+
+    def extend(self, points: Iterable[Point]) -> None:
+        for point in points:
+            self.insert(point)
+
+    def extend_fixes(self, fixes: FixColumns) -> None:
+        self.extend(PointArray.from_fixes(fixes))
+
+    def _cells(self, south: float, west: float, north: float, east: float) -> Iterator[array]:
+        first = floor((west + 180) / self.cell_size)
+        last = floor((east + 180) / self.cell_size)
+        if west > east:
+            # 날짜 변경선을 넘는 경우 두 구간으로 나눔
+            spans = [range(first, self.columns), range(0, last + 1)]
+        else:
+            spans = [range(first, last + 1)]
+        # 경도 180은 -180과 같은 열이므로 나머지 연산 후 중복을 제거함
+        columns = {column % self.columns for span in spans for column in span}
+
+        for row in range(self._row(south), self._row(north) + 1):
+            for column in columns:
+                if (cell := self.cells.get((row, column))) is not None:
+                    yield cell
+
+    def bbox(self, south: float, west: float, north: float, east: float) -> list[int]:
+        """경계 상자 안의 점 인덱스. west > east이면 날짜 변경선을 넘는 상자로 봄"""
+
+        latitude, longitude = self.points.latitude, self.points.longitude
+        crosses = west > east
+        found = []
+        for cell in self._cells(south, west, north, east):
+            for idx in cell:
+                lon = longitude[idx]
+                if south <= latitude[idx] <= north and (
+                    (west <= lon or lon <= east) if crosses else (west <= lon <= east)
+                ):
+                    found.append(idx)
+
+        return found
+
+    def radius(self, center: Point, meters: float) -> list[tuple[float, int]]:
+        """center에서 meters 안에 있는 점들의 (거리, 인덱스)"""
+
+        # 구면 위 반경 원의 경계 상자 (http://janmatuschek.de/LatitudeLongitudeBoundingCoordinates)
+        angle = meters / EARTH_RADIUS
+        dlat = degrees(angle)
+        south, north = center.latitude - dlat, center.latitude + dlat
+
+        if south <= -90 or north >= 90 or angle >= pi / 2:
+            # 극을 포함하면 모든 경도를 확인해야 함
+            south, north = max(-90.0, south), min(90.0, north)
+            west, east = -180.0, 180.0
+        else:
+            dlon = degrees(asin(min(1.0, sin(angle) / cos(center.lat))))
+            west, east = center.longitude - dlon, center.longitude + dlon
+            if west < -180:
+                west += 360
+            elif east > 180:
+                east -= 360
+
+        lat, lon = center.lat, center.lon
+        latitude, longitude = self.points.latitude, self.points.longitude
+        found = []
+        for cell in self._cells(south, west, north, east):
+            for idx in cell:
+                distance = _haversine(lat, lon, radians(latitude[idx]), radians(longitude[idx]))
+                if distance <= meters:
+                    found.append((distance, idx))
+
+        return found
+
+    def nearest(self, center: Point, k: int = 1) -> list[tuple[float, int]]:
+        """
+        가장 가까운 k개의 점. 반경 질의는 정확하므로 반경 안에 k개 이상이 있으면 그 중 가까운 k개가 답이 됨.
+        반경을 셀 크기부터 두 배씩 늘려 가며 찾음.
+        점이 k개보다 적으면 모든 점을 돌려줌.
+        """
+
+        k = min(k, len(self.points))
+        if k == 0:
+            return []
+
+        meters = self.cell_size * pi / 180 * EARTH_RADIUS
+        while True:
+            found = self.radius(center, meters)
+            if len(found) >= k or meters >= HALF_CIRCUMFERENCE:
+                return nsmallest(k, found)
+            meters *= 2
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+    from time import perf_counter
+
+    sizes = [int(size) for size in sys.argv[1:]] or [1_000_000, 10_000_000]
+    random.seed(0)
+
+    for size in sizes:
+        index = GridIndex(cell_size=0.1)
+        # 실제 로그처럼 몇몇 지역에 모여 있는 점들
+        hubs = [(random.uniform(-60, 60), random.uniform(-180, 180)) for _ in range(50)]
+
+        start = perf_counter()
+        for _ in range(size):
+            lat, lon = random.choice(hubs)
+            lon = (lon + random.gauss(0, 1) + 180) % 360 - 180
+            index.insert(Point(lat + random.gauss(0, 1), lon))
+        print(f"{size:>10} insert  {size / (perf_counter() - start):>12.0f} points/s")
+
+        queries = [Point(lat, lon) for lat, lon in random.sample(hubs, 10)]
+
+        def bbox(p: Point) -> list[int]:
+            return index.bbox(
+                p.latitude - 0.5, p.longitude - 0.5, p.latitude + 0.5, p.longitude + 0.5
+            )
+
+        for name, query in [
+            ("bbox", bbox),
+            ("radius", lambda p: index.radius(p, 10_000)),
+            ("nearest", lambda p: index.nearest(p, 10)),
+        ]:
+            start = perf_counter()
+            for point in queries:
+                query(point)
+            elapsed = (perf_counter() - start) / len(queries)
+            print(f"{size:>10} {name:7} {elapsed * 1000:>12.2f} ms/query")
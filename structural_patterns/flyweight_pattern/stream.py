@@ -0,0 +1,184 @@
+from typing import Iterator
+
+from typing_extensions import overload
+
+from structural_patterns.flyweight_pattern.main import Buffer, Message
+from structural_patterns.flyweight_pattern.pool import MessagePool
+
+"""
+Message는 Buffer에 대한 weakref를 갖기 때문에 한 번 만들어진 불변 바이트 덩어리에는 잘 맞지만 계속 들어오는 소켓 입력에는 맞지 않음.
+StreamBuffer는 청크를 뒤에 덧붙이고 이미 소비한 앞부분을 잘라내는 Buffer임.
+인덱스는 스트림 시작부터의 절대 위치를 사용하므로 잘라내도 살아 있는 Message의 오프셋은 그대로 유효하고,
+잘려 나간 구간을 가리키는 Message는 기존과 같은 "Broken reference" 에러로 실패함.
+소비한 바이트가 남아 있는 바이트의 절반 이상일 때만 잘라내므로 잘라내기 비용은 바이트당 분할 상환 O(1)이고 전체 백로그를 매번 복사하지 않음.
+"""
+
+
+class StreamBuffer(Buffer):
+    def __init__(self, compact_threshold: int = 64 * 1024) -> None:
+        self.content = bytearray()
+        # content[0]의 절대 위치
+        self.base = 0
+        self.consumed = 0
+        self.compact_threshold = compact_threshold
+
+    def __len__(self) -> int:
+        """
+        지금까지 들어온 전체 바이트 수. 인덱스는 0 ~ len(self) - 1의 절대 위치이지만
+        주소로 쓸 수 있는 것은 base 이상의 위치뿐이고, 그 앞은 "Broken reference"로 실패함.
+        """
+
+        return self.base + len(self.content)
+
+    def __iter__(self) -> Iterator[int]:
+        """남아 있는 바이트(절대 위치 base부터)만 순회함"""
+
+        return iter(self.content)
+
+    # Sequence의 index, __contains__, __reversed__, count는 위치 0부터 __getitem__으로 훑으므로
+    # 잘라낸 뒤에는 실패함. 모두 남아 있는 바이트만 대상으로 하도록 바꿈.
+
+    def __contains__(self, value: object) -> bool:
+        return value in self.content
+
+    def __reversed__(self) -> Iterator[int]:
+        return reversed(self.content)
+
+    def count(self, value: int) -> int:
+        return self.content.count(value)
+
+    def index(self, value: int, start: int = 0, stop: int | None = None) -> int:
+        """base 이상의 절대 위치를 돌려줌. start가 base보다 앞이면 base부터 찾음"""
+
+        stop = len(self) if stop is None else stop
+        idx = self.content.find(value, max(0, start - self.base), max(0, stop - self.base))
+        if idx == -1:
+            raise ValueError(f"{value!r} is not in buffer")
+
+        return idx + self.base
+
+    def _relative(self, idx: int) -> int:
+        if idx < self.base:
+            raise RuntimeError("Broken reference")
+        return idx - self.base
+
+    @overload
+    def __getitem__(self, idx: int) -> int: ...  # noqa
+
+    @overload
+    def __getitem__(self, idx: slice) -> bytes: ...  # noqa
+
+    def __getitem__(self, idx: int | slice) -> int | bytes:
+        if isinstance(idx, slice):
+            start = self._relative(self.base if idx.start is None else idx.start)
+            stop = None if idx.stop is None else self._relative(idx.stop)
+            return bytes(self.content[start:stop])
+
+        return self.content[self._relative(idx)]
+
+    def find(self, sub: bytes, start: int = 0) -> int:
+        idx = self.content.find(sub, max(0, start - self.base))
+        return -1 if idx == -1 else idx + self.base
+
+    def append(self, chunk: bytes) -> None:
+        self.content += chunk
+
+    def consume(self, upto: int) -> None:
+        """절대 위치 upto 이전의 바이트는 더 이상 필요하지 않음"""
+
+        self.consumed = max(self.consumed, min(upto, len(self)))
+        dead = self.consumed - self.base
+        if dead >= self.compact_threshold and dead * 2 >= len(self.content):
+            self.compact()
+
+    def compact(self) -> None:
+        del self.content[: self.consumed - self.base]
+        self.base = self.consumed
+
+
+class StreamParser:
+    """소켓에서 받은 청크를 StreamBuffer에 넣고 완성된 문장을 풀의 플라이웨이트로 돌려줌"""
+
+    def __init__(self, pool: MessagePool | None = None, compact_threshold: int = 64 * 1024) -> None:
+        self.buffer = StreamBuffer(compact_threshold)
+        self.pool = pool or MessagePool()
+        self.position = 0
+
+    def feed(self, chunk: bytes) -> Iterator[Message]:
+        """
+        청크는 호출 즉시 버퍼에 넣으므로 돌려받은 이터레이터를 순회하지 않아도 바이트를 잃지 않음.
+        순회하지 않은 문장은 다음 feed의 이터레이터에서 나옴.
+        """
+
+        self.buffer.append(chunk)
+        return self._drain()
+
+    def _drain(self) -> Iterator[Message]:
+        buffer = self.buffer
+
+        while (start := buffer.find(b"$", self.position)) != -1:
+            if start + 6 > len(buffer):
+                # 헤더가 아직 다 들어오지 않음
+                self.position = start
+                break
+
+            message = self.pool.acquire(buffer[start + 1 : start + 6])  # noqa
+            if message is None:
+                self.position = start + 1
+                buffer.consume(self.position)
+                continue
+
+            try:
+                message.from_buffer(buffer, start)
+            except IndexError:
+                # 문장의 나머지가 다음 청크로 들어올 때까지 기다림
+                self.pool.release(message)
+                self.position = start
+                break
+            except ValueError:
+                self.pool.release(message)
+                self.position = start + 1
+                buffer.consume(self.position)
+                continue
+
+            self.position = message.end
+            yield message
+            self.pool.release(message)
+            buffer.consume(self.position)
+        else:
+            self.position = len(buffer)
+            buffer.consume(self.position)
+
+
+if __name__ == "__main__":
+    from structural_patterns.flyweight_pattern.main import GPGLL
+
+    data = (
+        b"$GPGLL,3751.65,S,14507.36,E*77\r\n"
+        b"$GPGLL,3723.2475,N,12158.3416,W,161229.487,A,A*41\r\n"
+    )
+    parser = StreamParser(compact_threshold=16)
+
+    # 문장이 청크 경계에서 잘려 들어오는 경우
+    for idx in range(0, len(data), 10):
+        for message in parser.feed(data[idx : idx + 10]):  # noqa
+            print(message.get_fix())
+    # (37°51.6500S, 145°07.3600E)
+    # (37°23.2475N, 121°58.3416W)
+
+    print(parser.buffer.base, len(parser.buffer.content))
+    # 80 3
+
+    # 잘려 나간 구간을 가리키는 플라이웨이트는 조용히 잘못된 값을 읽지 않고 실패함
+    buffer = StreamBuffer(compact_threshold=16)
+    buffer.append(data)
+    flyweight = GPGLL().from_buffer(buffer, 0)
+    print(flyweight.get_fix())
+    # (37°51.6500S, 145°07.3600E)
+
+    buffer.consume(len(buffer))
+    try:
+        flyweight.get_fix()
+    except RuntimeError as error:
+        print(error)
+        # Broken reference